@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of startup time for short commands.
+
+Usage:
+    python benchmarks/startup.py [repeat]
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+
+DEFAULT_REPEAT = 10
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = (
+    ('import seismograph', ['-c', 'import seismograph']),
+    ('import seismograph.Case', ['-c', 'import seismograph; seismograph.Case']),
+    ('seismograph --help', ['-m', 'seismograph', '--help']),
+    ('mocker --help', ['-m', 'seismograph.ext.mocker', '--help']),
+)
+
+
+def measure(args, repeat):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        filter(None, (ROOT_PATH, env.get('PYTHONPATH'))),
+    )
+
+    times = []
+
+    with open(os.devnull, 'w') as devnull:
+        for _ in range(repeat):
+            start = time.time()
+            code = subprocess.call(
+                [sys.executable] + args, env=env, stdout=devnull, stderr=devnull,
+            )
+            times.append(time.time() - start)
+
+    return code, sorted(times)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REPEAT
+
+    # interpreter without imports is baseline
+    _, baseline = measure(['-c', 'pass'], repeat)
+    sys.stdout.write(
+        '{:<28} min {:.3f} sec.\n'.format('python -c pass', baseline[0]),
+    )
+
+    for name, args in COMMANDS:
+        code, times = measure(args, repeat)
+
+        if code:
+            sys.stdout.write('{:<28} exit code {}\n'.format(name, code))
+            continue
+
+        sys.stdout.write(
+            '{:<28} min {:.3f} sec. median {:.3f} sec. (+{:.3f} sec.)\n'.format(
+                name, times[0], times[len(times) // 2], times[0] - baseline[0],
+            ),
+        )
+
+
+if __name__ == '__main__':
+    main()
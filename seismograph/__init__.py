@@ -8,41 +8,71 @@ By Trifonov Mikhail
 For support, use the https://github.com/trifonovmixail/seismograph/issues tracker
 """
 
-from .case import skip
-from .case import Case
-from .case import flows
-from .case import skip_if
-from .case import assertion
-
-from .case import skip_unless
-from .case import AssertionBase
-
-from .suite import Suite
-
-from .script import Script
-from .script import AfterScript
-from .script import BeforeScript
-
-from .program import main
-from .program import Program
-
-from .config import get_config_path_by_env
-
-from .steps import step
-
-from .datastructures import Context
-
-from .layers import CaseLayer
-from .layers import SuiteLayer
-from .layers import ProgramLayer
-
-from .scope import configure
-from .scope import add_extension
-from .scope import match_case_to_layer
-from .scope import match_suite_to_layer
-from .scope import set_default_case_layers
-from .scope import set_default_suite_layers
-from .scope import set_default_program_layers
+import sys
+import importlib
+
+
+# name of attribute to name of module where it is defined.
+# Modules are imported on first access to attribute,
+# so that short commands do not import runtime of framework.
+_LAZY_ATTRIBUTES = {
+    'skip': 'case',
+    'Case': 'case',
+    'flows': 'case',
+    'skip_if': 'case',
+    'timeout': 'case',
+    'assertion': 'case',
+    'skip_unless': 'case',
+    'AssertionBase': 'case',
+    'Suite': 'suite',
+    'Script': 'script',
+    'AfterScript': 'script',
+    'BeforeScript': 'script',
+    'main': 'program',
+    'Program': 'program',
+    'get_config_path_by_env': 'config',
+    'step': 'steps',
+    'Context': 'datastructures',
+    'CaseLayer': 'layers',
+    'SuiteLayer': 'layers',
+    'ProgramLayer': 'layers',
+    'configure': 'scope',
+    'add_extension': 'scope',
+    'match_case_to_layer': 'scope',
+    'match_suite_to_layer': 'scope',
+    'set_default_case_layers': 'scope',
+    'set_default_suite_layers': 'scope',
+    'set_default_program_layers': 'scope',
+}
+
+
+def _load_attribute(name):
+    module = importlib.import_module(
+        '.{}'.format(_LAZY_ATTRIBUTES[name]), __name__,
+    )
+    value = getattr(module, name)
+    globals()[name] = value
+
+    return value
+
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name not in _LAZY_ATTRIBUTES:
+            raise AttributeError(
+                'module "{}" has no attribute "{}"'.format(__name__, name),
+            )
+
+        return _load_attribute(name)
+
+    def __dir__():
+        return sorted(set(globals()).union(_LAZY_ATTRIBUTES))
+else:
+    # module level __getattr__ is not supported
+    for _name in _LAZY_ATTRIBUTES:
+        _load_attribute(_name)
+
+    del _name
 
 
 __version__ = '0.4.1'
@@ -60,6 +90,7 @@ __all__ = (
     'Suite',
     'Script',
     'skip_if',
+    'timeout',
     'Context',
     'Program',
     'assertion',
@@ -3,12 +3,17 @@
 """
 Usage:
     python -m seismograph <suites path> [options]
+    python -m seismograph journal <merge|replay> [options]
 """
 
+import os
 import sys
 from importlib import import_module
 
 
+JOURNAL_COMMAND = 'journal'
+
+
 def apply_gevent_patch():
     from gevent.monkey import patch_all
 
@@ -39,7 +44,16 @@ def get_user_main():
     return None
 
 
+def is_journal_command():
+    return sys.argv[1:2] == [JOURNAL_COMMAND] and not os.path.exists(JOURNAL_COMMAND)
+
+
 def main():
+    if is_journal_command():
+        from seismograph import journal
+
+        return journal.main(sys.argv[2:])
+
     user_main = get_user_main()
 
     if not user_main and '--gevent' in sys.argv:
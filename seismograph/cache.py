@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cache of data between runs.
+Values are stored in json files of cache directory.
+"""
+
+import os
+import json
+import logging
+
+from . import runnable
+from .case import CaseBox
+from .suite import Suite
+
+
+logger = logging.getLogger(__name__)
+
+
+LAST_FAILED_KEY = 'lastfailed'
+
+
+class Cache(object):
+
+    def __init__(self, path):
+        self.__path = path
+
+    @property
+    def path(self):
+        return self.__path
+
+    def get_file_path(self, key):
+        return os.path.join(self.__path, '{}.json'.format(key))
+
+    def get(self, key, default=None):
+        file_path = self.get_file_path(key)
+
+        if not os.path.isfile(file_path):
+            return default
+
+        try:
+            with open(file_path, 'r') as fp:
+                return json.load(fp)
+        except ValueError:
+            logger.warning(
+                'Cache file "{}" is broken'.format(file_path),
+            )
+            return default
+
+    def set(self, key, value):
+        if not os.path.isdir(self.__path):
+            os.makedirs(self.__path)
+
+        with open(self.get_file_path(key), 'w') as fp:
+            json.dump(value, fp, indent=2, sort_keys=True)
+
+
+def get_last_failed(config):
+    if not config.CACHE_DIR:
+        return set()
+
+    return set(Cache(config.CACHE_DIR).get(LAST_FAILED_KEY, []))
+
+
+def update_last_failed(config, result):
+    """
+    Failed tests are added, tests which were run
+    without fail are removed, others are kept.
+    """
+    failed = get_last_failed(config)
+
+    for storage, is_failed in (
+            (result.successes, False),
+            (result.skipped, False),
+            (result.failures, True),
+            (result.errors, True)):
+        for record in storage:
+            if not record.is_case:
+                continue
+
+            if is_failed:
+                failed.add(record.stable_id)
+            else:
+                failed.discard(record.stable_id)
+
+    Cache(config.CACHE_DIR).set(LAST_FAILED_KEY, sorted(failed))
+
+
+def is_failed(obj, failed):
+    if isinstance(obj, Suite):
+        prefix = '{}:'.format(runnable.stable_id(obj))
+        return any(f.startswith(prefix) for f in failed)
+
+    if isinstance(obj, CaseBox):
+        return any(is_failed(c, failed) for c in obj)
+
+    return runnable.stable_id(obj) in failed
@@ -16,8 +16,10 @@ from .utils import pyv
 from . import extensions
 from .utils import common
 from .exceptions import Skip
+from .exceptions import CaseTimeout
 from .utils.common import measure_time
 from .utils.common import call_to_chain
+from .utils.watchdog import Watchdog
 from .exceptions import DependencyError
 from .exceptions import ExtensionNotRequired
 from .exceptions import ALLOW_RAISED_EXCEPTIONS
@@ -32,6 +34,7 @@ MATCH_CASE_TO_LAYER = {}
 
 SKIP_ATTRIBUTE_NAME = '__skip__'
 SKIP_WHY_ATTRIBUTE_NAME = '__skip_why__'
+TIMEOUT_ATTRIBUTE_NAME = '__timeout__'
 
 
 _jsonschema = None
@@ -106,6 +109,30 @@ def skip_unless(condition, reason):
     return lambda obj: obj
 
 
+def timeout(seconds):
+    """
+    Test is interrupted with error after timeout.
+    Can be used for test method or case class.
+    """
+    def wrapper(obj):
+        setattr(obj, TIMEOUT_ATTRIBUTE_NAME, seconds)
+        return obj
+    return wrapper
+
+
+def get_timeout(case):
+    method = getattr(case, runnable.method_name(case), None)
+    seconds = getattr(method, TIMEOUT_ATTRIBUTE_NAME, None)
+
+    if seconds is None:
+        seconds = getattr(case, TIMEOUT_ATTRIBUTE_NAME, None)
+
+    if seconds is None and case.config:
+        seconds = case.config.TEST_TIMEOUT
+
+    return seconds
+
+
 def set_no_skip():
     global _skip
 
@@ -183,6 +210,41 @@ def with_match_layers(context, case):
             yield layer
 
 
+def render_reason(steps_state, reason_storage):
+    reasons = []
+
+    if steps_state is not None:
+        history, current_step, current_flow = steps_state
+
+        reasons.append(
+            reason.join(
+                (
+                    reason.item(
+                        'History',
+                        'was done earlier',
+                        *history
+                    ),
+                    reason.item(
+                        'Current step',
+                        'when exception was raised',
+                        current_step,
+                    ),
+                    reason.item(
+                        'Current flow',
+                        'context of steps execution',
+                        current_flow,
+                    ),
+                ),
+            ),
+        )
+
+    reasons.append(
+        reason.storage_item('Case', 'info from test case', reason_storage),
+    )
+
+    return reason.join(*reasons)
+
+
 class CaseBox(object):
 
     def __init__(self, iterable):
@@ -207,7 +269,13 @@ class CaseBox(object):
         return str(self.__current)
 
     def __getattr__(self, item):
-        return getattr(self.__current, item)
+        current = self.__current
+
+        # box is not running, attributes are taken from first case
+        if current is None:
+            current = next(iter(self.__cases), None)
+
+        return getattr(current, item)
 
     def __len__(self):
         return len(self.__cases)
@@ -220,6 +288,13 @@ class CaseBox(object):
             self.__current(result)
 
     def __run__(self, result):
+        try:
+            self.__run_cases__(result)
+        finally:
+            # last case with its traceback is not kept by box after run
+            self.__current = None
+
+    def __run_cases__(self, result):
         for case in self.__cases:
             self.__current = case
             try:
@@ -755,44 +830,29 @@ class Case(with_metaclass(steps.CaseMeta, runnable.RunnableObject, runnable.Moun
             self.__mount_data__.suite_name, self.__class__.__name__,
         )
 
-    def __reason__(self):
-        reasons = []
+    def __stable_id__(self):
+        return '{}:{}.{}'.format(
+            self.__mount_data__.suite_name,
+            self.__class__.__name__,
+            self._method_name,
+        )
+
+    def __snapshot_reason__(self):
+        steps_state = None
 
         if steps.is_step_by_step_case(self):
-            history = steps.get_case_history(self) or [None]
-
-            reasons.append(
-                reason.join(
-                    (
-                        reason.item(
-                            'History',
-                            'was done earlier',
-                            *history
-                        ),
-                        reason.item(
-                            'Current step',
-                            'when exception was raised',
-                            steps.get_current_step(self),
-                        ),
-                        reason.item(
-                            'Current flow',
-                            'context of steps execution',
-                            steps.get_current_flow(self),
-                        ),
-                    ),
-                ),
+            steps_state = (
+                list(steps.get_case_history(self) or [None]),
+                steps.get_current_step(self),
+                pyv.unicode_string(steps.get_current_flow(self)),
             )
 
-        if self.reason_storage:
-            reasons.append(
-                reason.item(
-                    'Case',
-                    'info from test case',
-                    *(u'{}: {}'.format(k, v) for k, v in self.reason_storage.items())
-                ),
-            )
+        return reason.Snapshot(
+            render_reason, steps_state, list(self.reason_storage.items()),
+        )
 
-        return reason.join(*reasons)
+    def __reason__(self):
+        return self.__snapshot_reason__()()
 
     def __run__(self, result):
         self.__is_run = True
@@ -827,7 +887,7 @@ class Case(with_metaclass(steps.CaseMeta, runnable.RunnableObject, runnable.Moun
                 was_success = True
 
                 for _ in iter(repeat(self)):
-                    with self.__context(self):
+                    with self.__watchdog(), self.__impact(), self.__context(self):
                         try:
                             test_method = prepare(
                                 self, getattr(self, runnable.method_name(self)),
@@ -881,6 +941,28 @@ class Case(with_metaclass(steps.CaseMeta, runnable.RunnableObject, runnable.Moun
                     self, tb, timer(), error,
                 )
 
+    def __impact(self):
+        # tracer is used by recording run only
+        if not (self.config and self.config.RECORD_IMPACT):
+            return common.EMPTY_CONTEXT
+
+        from . import impact
+        return impact.trace(self)
+
+    def __watchdog(self):
+        seconds = get_timeout(self)
+
+        def on_timeout(stacks):
+            self.reason_storage['Timeout'] = seconds
+            self.reason_storage['Stacks on timeout'] = u'\n{}'.format(stacks)
+
+        return Watchdog(
+            seconds,
+            CaseTimeout,
+            callback=on_timeout,
+            use_gevent=bool(self.config and self.config.GEVENT),
+        )
+
     #
     # Behavior on magic methods
     #
@@ -922,9 +1004,10 @@ class Case(with_metaclass(steps.CaseMeta, runnable.RunnableObject, runnable.Moun
         if use_flows:
             apply_flows(self)
 
+        # case should not be kept by own context after run
         self.__context = CaseContext(
-            self.setup,
-            self.teardown,
+            common.weak_method(self.setup),
+            common.weak_method(self.teardown),
             layers=self.__layers__,
         )
 
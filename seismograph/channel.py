@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+
+"""
+Result channel from worker to owner of result.
+Worker can be child process or remote machine.
+Record is tuple of marshal supported types.
+"""
+
+import os
+import time
+import marshal
+
+from . import runnable
+from .case import CaseBox
+from .case import get_timeout
+from .xunit import XUnitData
+from .exceptions import CaseTimeout
+from .exceptions import WorkerError
+from .result import FAIL
+from .result import ERROR
+from .result import ResultListener
+
+
+ADD_RECORD = 0
+SUITE_RECORD = 1
+OUTPUT_RECORD = 2
+TASK_RECORD = 3
+DONE_RECORD = 4
+START_RECORD = 5
+STOP_RECORD = 6
+
+
+def dumps(record):
+    return marshal.dumps(record)
+
+
+def loads(data):
+    return marshal.loads(data)
+
+
+def get_id(runnable_object):
+    return runnable_object.id
+
+
+def get_unit(runnable_object):
+    # case box is matched by its first case
+    if isinstance(runnable_object, CaseBox):
+        return next(iter(runnable_object), None)
+
+    return runnable_object
+
+
+class ChannelListener(ResultListener):
+
+    def __init__(self, channel, get_key=get_id):
+        self.channel = channel
+        self.get_key = get_key
+
+    def on_start(self, result, runnable_object):
+        self.channel.send(
+            (START_RECORD, self.get_key(runnable_object), os.getpid()),
+        )
+
+    def on_add(self, result, status, runnable_object, xunit_data):
+        self.channel.send(
+            (ADD_RECORD, status, self.get_key(runnable_object), xunit_data.to_tuple()),
+        )
+
+    def send_task(self, runnable_object):
+        runnable_object = get_unit(runnable_object)
+
+        if runnable_object is None:
+            return
+
+        self.channel.send(
+            (TASK_RECORD, self.get_key(runnable_object), os.getpid()),
+        )
+
+    def send_stop(self):
+        # worker has taken its sentinel from queue
+        self.channel.send((STOP_RECORD, os.getpid()))
+
+    def send_suite(self, suite, proxy):
+        self.channel.send(
+            (SUITE_RECORD, self.get_key(suite), proxy.runtime),
+        )
+
+
+class ChannelStream(object):
+    """
+    Console of worker is writing to owner of result
+    """
+
+    def __init__(self, channel):
+        self.channel = channel
+
+    def write(self, string):
+        if string:
+            self.channel.send((OUTPUT_RECORD, string))
+
+    def flush(self):
+        pass
+
+
+def connect_result(result, channel, get_key=get_id):
+    """
+    Results of worker are going to channel only.
+    Listeners of owner are called there after merge.
+    """
+    listener = ChannelListener(channel, get_key=get_key)
+
+    listeners = result.listeners
+    del listeners[:]
+    listeners.append(listener)
+
+    result._stream = ChannelStream(channel)
+
+    return listener
+
+
+class ResultMerger(object):
+
+    def __init__(self, result, get_key=get_id):
+        self.result = result
+        self.get_key = get_key
+
+        # key of runnable object to object and suite
+        self.objects = {}
+        self.suites = {}
+
+        # opened proxies of suites by key of suite
+        self.suite_proxies = {}
+
+        # running objects by key to pid of worker and time of start,
+        # worker can run several objects at the same time by threads
+        self.started = {}
+
+        # key of unit of work which was taken by worker by pid
+        self.tasks = {}
+
+        # unit of work is suite or case box, key of unit to keys of cases
+        self.units = {}
+
+        # keys of objects which have result
+        self.merged = set()
+
+        # pids of workers which have taken sentinel
+        self.stopped = set()
+
+    def match_case(self, case, suite=None):
+        keys = []
+
+        for c in (case if isinstance(case, CaseBox) else (case, )):
+            key = self.get_key(c)
+
+            self.objects[key] = c
+            keys.append(key)
+
+            if suite is not None:
+                self.suites[key] = suite
+
+        # case or case box without suite is unit of work
+        if suite is None and keys:
+            self.units[keys[0]] = keys
+
+        return keys
+
+    def match_suite(self, suite):
+        key = self.get_key(suite)
+
+        self.objects[key] = suite
+        self.suites[key] = suite
+
+        keys = []
+
+        for case in suite:
+            keys.extend(self.match_case(case, suite=suite))
+
+        self.units[key] = keys
+
+    def get_proxy(self, key):
+        # Results of suites are merged to proxy of suite,
+        # results of cases are merged to current result.
+        suite = self.suites.get(key)
+
+        if suite is None:
+            return self.result
+
+        suite_key = self.get_key(suite)
+        proxy = self.suite_proxies.get(suite_key)
+
+        if proxy is None:
+            proxy = self.result.create_proxy(
+                name=runnable.class_name(suite),
+            )
+            self.suite_proxies[suite_key] = proxy
+
+        return proxy
+
+    def merge_start(self, key, pid):
+        self.started[key] = (pid, time.time())
+
+    def merge_task(self, key, pid):
+        self.tasks[pid] = key
+
+    def merge_stop(self, pid):
+        self.stopped.add(pid)
+
+    def merge_item(self, status, key, xunit_data):
+        runnable_object = self.objects[key]
+        xunit_data = XUnitData.from_tuple(xunit_data)
+
+        self.started.pop(key, None)
+        self.merged.add(key)
+
+        # stopped_on was changed by worker only
+        if status in (ERROR, FAIL) and xunit_data.method_name:
+            runnable.stopped_on(runnable_object, xunit_data.method_name)
+
+        self.get_proxy(key).add_item(
+            status, runnable_object, xunit_data,
+        )
+
+        if status in (ERROR, FAIL) and self.result.config.STOP:
+            self.result.current_state.should_stop = True
+
+    def merge_suite(self, key, runtime):
+        proxy = self.get_proxy(key)
+        proxy.runtime = runtime
+
+        self.close_proxy(key)
+
+    def close_proxy(self, key):
+        proxy = self.suite_proxies.pop(key)
+
+        self.result.extend(proxy)
+        self.result.proxies.append(proxy)
+
+    def write_output(self, string):
+        self.result._stream.write(string)
+        self.result._stream.flush()
+
+    def merge(self, record):
+        if record[0] == ADD_RECORD:
+            self.merge_item(*record[1:])
+        elif record[0] == SUITE_RECORD:
+            self.merge_suite(*record[1:])
+        elif record[0] == OUTPUT_RECORD:
+            self.write_output(record[1])
+        elif record[0] == START_RECORD:
+            self.merge_start(*record[1:])
+        elif record[0] == TASK_RECORD:
+            self.merge_task(*record[1:])
+        elif record[0] == STOP_RECORD:
+            self.merge_stop(*record[1:])
+
+    def get_running(self, pid):
+        return [
+            (key, started) for key, (worker_pid, started) in self.started.items()
+            if worker_pid == pid
+        ]
+
+    def is_hung(self, key, started, delay=0):
+        seconds = get_timeout(self.objects[key])
+        return bool(seconds) and time.time() - started > seconds + delay
+
+    def get_hung(self, pid, delay=0):
+        """
+        Key of object which is running by worker
+        longer than its timeout and delay
+        """
+        for key, started in self.get_running(pid):
+            if self.is_hung(key, started, delay=delay):
+                return key
+
+        return None
+
+    def add_error(self, key, error, reason, runtime):
+        runnable_object = self.objects[key]
+
+        self.started.pop(key, None)
+        self.merged.add(key)
+
+        self.get_proxy(key).add_item(
+            ERROR,
+            runnable_object,
+            XUnitData(
+                exc=error,
+                reason=reason,
+                runtime=runtime,
+                class_name=runnable.class_name(runnable_object),
+                method_name=runnable.method_name(runnable_object),
+            ),
+        )
+
+    def get_unit_key(self, runnable_object):
+        runnable_object = get_unit(runnable_object)
+        return self.get_key(runnable_object) if runnable_object is not None else None
+
+    def add_unit_not_run(self, key, reason):
+        for k in self.units.get(key, ()):
+            if k in self.merged or k in self.started:
+                continue
+
+            self.add_error(
+                k,
+                WorkerError('Test was not run because worker was lost'),
+                reason,
+                float(),
+            )
+
+    def add_lost(self, key, address):
+        reason = u'Worker "{}" was lost while suite was running.\n'.format(address)
+
+        for k in self.units.get(key, ()):
+            if k in self.started:
+                _, started = self.started[k]
+
+                self.add_error(
+                    k,
+                    WorkerError('Worker was lost while test was running'),
+                    reason,
+                    time.time() - started,
+                )
+
+        self.add_unit_not_run(key, reason)
+
+    def add_not_run(self, pid):
+        # rest of unit of lost worker will not be run by another one
+        self.add_unit_not_run(
+            self.tasks.pop(pid, None),
+            u'Worker "{}" was lost before test was run.\n'.format(pid),
+        )
+
+    def add_killed(self, pid, delay=0):
+        for key, started in self.get_running(pid):
+            if self.is_hung(key, started, delay=delay):
+                error = CaseTimeout(
+                    'Worker was killed after timeout "{}" sec.'.format(
+                        get_timeout(self.objects[key]),
+                    ),
+                )
+            else:
+                error = WorkerError(
+                    'Worker was killed while test was running',
+                )
+
+            self.add_error(
+                key,
+                error,
+                u'Worker "{}" was killed because test was not interrupted '
+                u'by timeout. Test can be blocked on io or lock.\n'.format(pid),
+                time.time() - started,
+            )
+
+        self.add_not_run(pid)
+
+    def add_crashed(self, pid, exitcode):
+        for key, started in self.get_running(pid):
+            self.add_error(
+                key,
+                WorkerError(
+                    'Worker was crashed with exit code "{}"'.format(exitcode),
+                ),
+                u'Worker "{}" was crashed with exit code "{}" '
+                u'while test was running.\n'.format(pid, exitcode),
+                time.time() - started,
+            )
+
+        self.add_not_run(pid)
+
+    def close(self):
+        # suites of lost workers have partial results
+        for key in list(self.suite_proxies):
+            self.close_proxy(key)
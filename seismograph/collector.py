@@ -1,22 +1,53 @@
 # -*- coding: utf-8 -*-
 
 import logging
+from zlib import crc32
 from random import Random
+from collections import OrderedDict
 
 from . import loader
 from . import extensions
 from .suite import BuildRule
-from .exceptions import CollectError
 from .utils.common import call_to_chain
 
 
 logger = logging.getLogger(__name__)
 
 
+def create_sort(keys):
+    def sort(objects):
+        objects.sort(key=lambda obj: tuple(k(obj) for k in keys))
+    return sort
+
+
 def get_shuffle(config):
     if config.RANDOM:
         random = Random(config.RANDOM_SEED)
         return random.shuffle
+
+    keys = []
+
+    if config.FAILED_FIRST:
+        from . import cache
+
+        failed = cache.get_last_failed(config)
+
+        if failed:
+            logger.debug('Failed first order by cache')
+            keys.append(lambda obj: not cache.is_failed(obj, failed))
+
+    if config.HISTORY_FILE:
+        from . import history
+
+        runtime_history = history.History(config.HISTORY_FILE)
+
+        if runtime_history:
+            logger.debug('Longest first order by runtime history')
+            keys.append(lambda obj: -runtime_history.weight(obj))
+
+    if keys:
+        return create_sort(keys)
+
     return None
 
 
@@ -53,11 +84,48 @@ def get_test_name_from_command(command):
         return None
 
 
-def try_apply_rules(suite, rules):
-    for rule in rules[::-1]:
-        if rule.is_of(suite):
-            suite.assign_build_rule(rule)
-            rules.remove(rule)
+def create_rule(command):
+    return BuildRule(
+        suite_name=get_suite_name_from_command(command),
+        case_name=get_case_name_from_command(command),
+        test_name=get_test_name_from_command(command),
+    )
+
+
+def is_of_command(test_id, command):
+    return test_id == command or test_id.startswith(
+        (command + ':', command + '.'),
+    )
+
+
+def rule_exists(index, rule):
+    suite = index.get(rule.suite_name)
+
+    if suite is None:
+        return False
+
+    if not rule.case_name:
+        return True
+
+    case_class = suite.cases_by_name.get(rule.case_name)
+
+    if case_class is None:
+        return False
+
+    return not rule.test_name or hasattr(case_class, rule.test_name)
+
+
+def group_rules_by_suite(rules):
+    """
+    Suites are going in order of last command of suite
+    and rules of suite are assigned in reverse order.
+    """
+    grouped = OrderedDict()
+
+    for rule in reversed(rules):
+        grouped.setdefault(rule.suite_name, []).append(rule)
+
+    return grouped
 
 
 def base_generator(suites, shuffle=None):
@@ -72,21 +140,16 @@ def base_generator(suites, shuffle=None):
 
 
 def generator_by_commands(suites, rules, shuffle=None):
+    index = loader.index_suites(suites)
     loaded_suites = []
 
-    for rule in rules[::-1]:
-        suite = loader.load_suite_by_name(rule.suite_name, suites)
+    for suite_name, suite_rules in group_rules_by_suite(rules).items():
+        suite = loader.load_suite_from_index(suite_name, index)
 
-        try_apply_rules(suite, rules)
-        if suite not in loaded_suites:
-            loaded_suites.append(suite)
+        for rule in suite_rules:
+            suite.assign_build_rule(rule)
 
-    if rules:
-        raise CollectError(
-            'incorrect commands to collect "{}"'.format(
-                ', '.join(str(r) for r in rules),
-            ),
-        )
+        loaded_suites.append(suite)
 
     call_to_chain(loaded_suites, 'build', shuffle=shuffle)
     extensions.clear()
@@ -98,18 +161,160 @@ def generator_by_commands(suites, rules, shuffle=None):
         yield suite
 
 
+def get_shard_units(suites, rules=None):
+    """
+    Unit of shard is case class or test from command.
+    Rule of suite is expanded to rules of its case classes.
+    """
+    if rules is None:
+        rules = [BuildRule(suite_name=s.name) for s in suites]
+
+    index = loader.index_suites(suites)
+    units = []
+
+    for rule in rules:
+        if rule.case_name:
+            units.append(str(rule))
+            continue
+
+        suite = loader.load_suite_from_index(rule.suite_name, index)
+
+        for case_class in suite.cases:
+            units.append(
+                str(BuildRule(suite_name=suite.name, case_name=case_class.__name__)),
+            )
+
+    return sorted(set(units))
+
+
+def split_to_shards(units, total, runtime_history=None):
+    shards = [[] for _ in range(total)]
+
+    if runtime_history:
+        # The longest unit goes to the least loaded shard.
+        # Each runner computes the same split from the same history.
+        loads = [float() for _ in range(total)]
+        weighted = sorted(
+            units, key=lambda u: (-runtime_history.get_unit_runtime(u), u),
+        )
+
+        for unit in weighted:
+            index = loads.index(min(loads))
+            shards[index].append(unit)
+            loads[index] += runtime_history.get_unit_runtime(unit)
+    else:
+        for unit in units:
+            shards[(crc32(unit.encode('utf-8')) & 0xffffffff) % total].append(unit)
+
+    return shards
+
+
+def get_shard_rules(suites, config, rules=None):
+    index, total = config.SHARD
+
+    runtime_history = None
+
+    if config.HISTORY_FILE:
+        from . import history
+
+        runtime_history = history.History(config.HISTORY_FILE)
+
+    units = split_to_shards(
+        get_shard_units(suites, rules=rules), total, runtime_history=runtime_history,
+    )[index - 1]
+
+    logger.debug(
+        'Shard {} of {} has {} units'.format(index, total, len(units)),
+    )
+
+    return [create_rule(u) for u in units]
+
+
+def get_last_failed_rules(suites, config, rules=None):
+    """
+    Rules of failed tests from cache. Tests which
+    are not exist anymore or out of rules are dropped.
+    """
+    from . import cache
+
+    failed = sorted(cache.get_last_failed(config))
+
+    if rules is not None:
+        commands = [str(r) for r in rules]
+        failed = [
+            f for f in failed if any(is_of_command(f, c) for c in commands)
+        ]
+
+    index = loader.index_suites(suites)
+    last_failed = [
+        rule for rule in (create_rule(f) for f in failed)
+        if rule_exists(index, rule)
+    ]
+
+    if not last_failed:
+        logger.info('No failed tests in cache, all of tests will be run')
+        return rules
+
+    logger.debug(
+        'Run {} failed tests from cache'.format(len(last_failed)),
+    )
+
+    return last_failed
+
+
+def get_test_ids(suites, rules=None):
+    commands = [str(r) for r in rules] if rules is not None else None
+
+    for suite in suites:
+        for case_class in suite.cases:
+            for test_name in loader.load_test_names_from_case(case_class):
+                test_id = '{}:{}.{}'.format(suite.name, case_class.__name__, test_name)
+
+                if commands is None or any(is_of_command(test_id, c) for c in commands):
+                    yield test_id
+
+
+def get_affected_rules(suites, config, rules=None):
+    """
+    Rules of tests which have executed changed files.
+    Tests which were not recorded yet are run always.
+    """
+    from . import cache
+    from . import impact
+
+    index = impact.ImpactIndex.load(cache.Cache(config.CACHE_DIR))
+    changed = impact.get_changed_files(config.AFFECTED_BY)
+
+    test_ids = list(get_test_ids(suites, rules=rules))
+    affected = index.get_affected(test_ids, changed)
+
+    logger.info(
+        '{} of {} tests are affected by {} changed files'.format(
+            len(affected), len(test_ids), len(changed),
+        ),
+    )
+
+    return [create_rule(t) for t in affected]
+
+
 def create_generator(suites, config):
+    rules = None
+
     if config.TESTS:
+        rules = [create_rule(c) for c in config.TESTS]
+
+    if config.LAST_FAILED:
+        rules = get_last_failed_rules(suites, config, rules=rules)
+
+    if config.AFFECTED_BY:
+        rules = get_affected_rules(suites, config, rules=rules)
+
+    if config.SHARD:
+        rules = get_shard_rules(suites, config, rules=rules)
+
+    if rules is not None:
         logger.debug('Create suite generator by commands')
 
-        rules = [
-            BuildRule(
-                suite_name=get_suite_name_from_command(c),
-                case_name=get_case_name_from_command(c),
-                test_name=get_test_name_from_command(c),
-            )
-            for c in config.TESTS
-        ]
         return generator_by_commands(
             suites, rules, shuffle=get_shuffle(config),
         )
@@ -16,6 +16,9 @@ from .datastructures import DictObject
 logger = logging.getLogger(__name__)
 
 
+DEFAULT_CACHE_DIR = '.seismograph_cache'
+
+
 def create_option_parser():
     parser = OptionParser('seismograph <suites_path> [options]')
 
@@ -26,6 +29,20 @@ def create_option_parser():
         default=None,
         help='Path to xml file to store the xunit report in.',
     )
+    result_group.add_option(
+        '--xunit-stream',
+        dest='XUNIT_STREAM',
+        action='store_true',
+        default=False,
+        help='Write xunit report while tests are running.',
+    )
+    result_group.add_option(
+        '--result-journal',
+        dest='RESULT_JOURNAL',
+        default=None,
+        help='Path to binary file to append results in while tests are running. '
+             'Journals can be merged and replayed by "seismograph journal".',
+    )
     parser.add_option_group(result_group)
 
     console_group = OptionGroup(parser, 'Output options')
@@ -57,6 +74,14 @@ def create_option_parser():
         default=False,
         help='Detail stat from suites.',
     )
+    console_group.add_option(
+        '--progress',
+        action='store_true',
+        dest='PROGRESS',
+        default=False,
+        help='Write progress line with ETA to stderr while tests are running. '
+             'ETA is computed by runtime history if history file is given.',
+    )
     console_group.add_option(
         '--tree',
         dest='TREE',
@@ -64,6 +89,15 @@ def create_option_parser():
         default=False,
         help='Print tree of suites to console.',
     )
+    console_group.add_option(
+        '--collect-only',
+        dest='COLLECT_ONLY',
+        action='store_true',
+        default=False,
+        help='Load and build suites without run. Print json with ids of tests, flows, '
+             'skip reasons and required extensions, time of import of modules '
+             'and time of build of suites.',
+    )
     console_group.add_option(
         '--no-color',
         dest='NO_COLOR',
@@ -119,6 +153,15 @@ def create_option_parser():
         default=None,
         help='Regexp for not allow registration suite by name.',
     )
+    run_group.add_option(
+        '--shard',
+        dest='SHARD',
+        type=str,
+        default=None,
+        help='Run one part of tests only. Format is "INDEX/TOTAL", '
+             'index is from 1 to total. Parts are balanced by '
+             'runtime history if history file is given.',
+    )
     run_group.add_option(
         '-x', '--stop',
         dest='STOP',
@@ -140,6 +183,62 @@ def create_option_parser():
         default=False,
         help='Random order when tests is running.',
     )
+    run_group.add_option(
+        '--history-file',
+        dest='HISTORY_FILE',
+        type=str,
+        default=None,
+        help='Path to json file to store runtime history in. '
+             'The longest suites and cases are started first by history.',
+    )
+    run_group.add_option(
+        '--cache-dir',
+        dest='CACHE_DIR',
+        type=str,
+        default=None,
+        help='Directory to store data between runs in. Failed tests are stored there. '
+             '"{}" is used by --lf, --ff, --record-impact and --affected-by '
+             'if it is not given.'.format(DEFAULT_CACHE_DIR),
+    )
+    run_group.add_option(
+        '--lf', '--last-failed',
+        dest='LAST_FAILED',
+        action='store_true',
+        default=False,
+        help='Run failed tests of last run only. All of tests are run if there are no failed.',
+    )
+    run_group.add_option(
+        '--ff', '--failed-first',
+        dest='FAILED_FIRST',
+        action='store_true',
+        default=False,
+        help='Run failed tests of last run before others.',
+    )
+    run_group.add_option(
+        '--parallel-discovery',
+        dest='PARALLEL_DISCOVERY',
+        type=int,
+        default=None,
+        help='Number of processes to import new and changed modules of suites path '
+             'which are described in collection manifest then. Is used with -t, --tree or --collect-only.',
+    )
+    run_group.add_option(
+        '--record-impact',
+        dest='RECORD_IMPACT',
+        action='store_true',
+        default=False,
+        help='Record source files executed by each test to cache directory. '
+             'Tests with unchanged sources are not recorded again. Can not be used with gevent.',
+    )
+    run_group.add_option(
+        '--affected-by',
+        dest='AFFECTED_BY',
+        type=str,
+        default=None,
+        help='Run tests affected by changes only. Changes are comma separated files '
+             'or git revision range, e.g. "origin/master...HEAD". '
+             'Impact of tests is taken from cache recorded by --record-impact.',
+    )
     run_group.add_option(
         '--first-flow-only',
         dest='FIRST_FLOW_ONLY',
@@ -195,6 +294,14 @@ def create_option_parser():
         default=False,
         help='Allow to create separated case classes for flow from base case.',
     )
+    run_group.add_option(
+        '--test-timeout',
+        type=float,
+        dest='TEST_TIMEOUT',
+        default=None,
+        help='Timeout of one test in seconds. '
+             'Test is interrupted with error after it.',
+    )
     run_group.add_option(
         '--mp-timeout',
         type=float,
@@ -223,6 +330,28 @@ def create_option_parser():
         default=False,
         help='Use multiprocessing groups for run.',
     )
+    run_group.add_option(
+        '--mp-cases',
+        dest='MULTIPROCESSING_CASES',
+        action='store_true',
+        default=False,
+        help='Distribute cases of suite to processes instead of suites.',
+    )
+    run_group.add_option(
+        '--coordinator',
+        dest='COORDINATOR',
+        type=str,
+        default=None,
+        help='Give suites to remote workers and collect their results. '
+             'Format is "HOST:PORT", workers are connected to this address.',
+    )
+    run_group.add_option(
+        '--worker',
+        dest='WORKER',
+        type=str,
+        default=None,
+        help='Run suites which are given by coordinator at "HOST:PORT".',
+    )
     run_group.add_option(
         '--pdb',
         dest='PDB',
@@ -246,9 +375,77 @@ def prepare_config(config):
             config.ASYNC_SUITES or config.ASYNC_TESTS):
         config.MULTIPROCESSING = True
 
+    if config.MULTIPROCESSING_CASES:
+        config.MULTIPROCESSING = True
+
     if (config.STEPS_LOG or config.FLOWS_LOG) and not config.VERBOSE:
         config.VERBOSE = True
 
+    if config.SHARD:
+        config.SHARD = parse_shard(config.SHARD)
+
+    # cache is not touched by run without options which need it
+    if not config.CACHE_DIR and (config.LAST_FAILED or
+                                 config.FAILED_FIRST or
+                                 config.RECORD_IMPACT or
+                                 config.AFFECTED_BY):
+        config.CACHE_DIR = DEFAULT_CACHE_DIR
+
+    if config.XUNIT_STREAM and not config.XUNIT_REPORT:
+        raise ConfigError(
+            'xunit report can not be streamed without path to report',
+        )
+
+    # greenlets are sharing trace function of thread
+    if config.RECORD_IMPACT and config.GEVENT:
+        raise ConfigError(
+            'impact can not be recorded with gevent',
+        )
+
+    if config.COORDINATOR and config.WORKER:
+        raise ConfigError(
+            'program can not be coordinator and worker at the same time',
+        )
+
+    if config.COORDINATOR:
+        config.COORDINATOR = parse_address(config.COORDINATOR)
+
+    if config.WORKER:
+        config.WORKER = parse_address(config.WORKER)
+
+
+def parse_shard(value):
+    if isinstance(value, tuple):
+        return value
+
+    try:
+        index, total = (int(i) for i in value.split('/'))
+    except ValueError:
+        raise ConfigError(
+            'shard should be in format "INDEX/TOTAL", got "{}"'.format(value),
+        )
+
+    if total < 1 or not 1 <= index <= total:
+        raise ConfigError(
+            'shard index should be from 1 to {}, got "{}"'.format(total, value),
+        )
+
+    return index, total
+
+
+def parse_address(value):
+    if isinstance(value, tuple):
+        return value
+
+    host, _, port = value.rpartition(':')
+
+    try:
+        return host, int(port)
+    except ValueError:
+        raise ConfigError(
+            'address should be in format "HOST:PORT", got "{}"'.format(value),
+        )
+
 
 def get_config_path_by_env(env_name, default=None, base_path=None):
     config_path = os.getenv(env_name, default)
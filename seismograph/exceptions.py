@@ -39,6 +39,14 @@ class TimeoutException(SeismographError):
     pass
 
 
+class CaseTimeout(TimeoutException):
+
+    def __init__(self, message=None, *args, **kwargs):
+        super(CaseTimeout, self).__init__(
+            message or 'Test was interrupted by timeout', *args, **kwargs
+        )
+
+
 class ExtensionNotFound(SeismographError):
     pass
 
@@ -51,6 +59,14 @@ class DependencyError(SeismographError):
     pass
 
 
+class JournalError(SeismographError):
+    pass
+
+
+class WorkerError(SeismographError):
+    pass
+
+
 ALLOW_RAISED_EXCEPTIONS = (
     EmergencyStop,
     KeyboardInterrupt,
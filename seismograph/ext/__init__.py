@@ -1,38 +1,51 @@
 # -*- coding: utf-8 -*-
 
+"""
+Extensions are imported on first call of load_extensions
+because dependencies of them are heavy for short commands.
+"""
+
 import logging
+from importlib import import_module
 
 
 logger = logging.getLogger(__name__)
 
 
+EXTENSIONS = (
+    'mocker',
+    'alchemy',
+    'selenium',
+    'seisma',
+)
+
+# import error of these extensions is not ignored
+REQUIRED_EXTENSIONS = (
+    'seisma',
+)
+
+
 TO_INIT = []
 
 
-try:
-    from . import mocker
-    TO_INIT.append(mocker)
-except ImportError:
-    pass
+_loaded = False
+
 
-try:
-    from . import alchemy
-    TO_INIT.append(alchemy)
-except ImportError:
-    pass
+def load_extensions():
+    global _loaded
 
-try:
-    from . import selenium
-    TO_INIT.append(selenium)
-except ImportError:
-    pass
+    if _loaded:
+        return TO_INIT
 
+    for name in EXTENSIONS:
+        try:
+            TO_INIT.append(import_module('.{}'.format(name), __name__))
+        except ImportError:
+            if name in REQUIRED_EXTENSIONS:
+                raise
 
-try:
-    from . import seisma
-    TO_INIT.append(seisma)
-except ImportError:
-    raise
+    _loaded = True
 
+    logger.debug('Available extensions: {}'.format(TO_INIT))
 
-logger.debug('Available extensions: {}'.format(TO_INIT))
+    return TO_INIT
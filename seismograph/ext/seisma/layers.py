@@ -55,11 +55,7 @@ def _get_client_kwargs_from_config(config):
 
 
 def _get_reason(obj, tb):
-    return reason.format_reason(
-        reason.create(
-            obj, tb, config=obj.config,
-        ),
-    )
+    return reason.capture(obj, tb)()
 
 
 def _get_case_name(case):
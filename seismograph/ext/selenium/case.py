@@ -83,6 +83,14 @@ def save_logs(case):
         logger.er(error, exc_info=True)
 
 
+def render_reason(reason_storage):
+    return reason.item(
+        'Selenium',
+        'info from selenium extension',
+        *(u'{}: {}'.format(k, v) for k, v in reason_storage)
+    )
+
+
 class SeleniumAssertion(case.AssertionBase):
 
     @staticmethod
@@ -352,11 +360,9 @@ class SeleniumCase(case.Case):
 
             self.page = None
 
-    def __reason__(self):
+    def __snapshot_reason__(self):
         selenium = self.ext(EX_NAME)
-        reasons = [
-            super(SeleniumCase, self).__reason__(),
-        ]
+        snapshot = super(SeleniumCase, self).__snapshot_reason__()
 
         try:
             screen_url = selenium.config.get('SCREEN_URL', None)
@@ -378,17 +384,16 @@ class SeleniumCase(case.Case):
                 except BaseException as error:
                     logger.warn(error, exc_info=True)
 
-            reasons.append(
-                reason.item(
-                    'Selenium',
-                    'info from selenium extension',
-                    *(u'{}: {}'.format(k, v) for k, v in selenium.browser.reason_storage.items())
-                ),
+            # screenshot is made while browser is alive, text is rendered later
+            return reason.Snapshot(
+                reason.join,
+                snapshot,
+                reason.Snapshot(render_reason, list(selenium.browser.reason_storage.items())),
             )
         except BaseException as error:
             logger.error(error, exc_info=True)
 
-        return reason.join(reasons)
+        return snapshot
 
     def __repeat__(self):
         if self.config.SELENIUM_BROWSERS and self.__repeatable__:
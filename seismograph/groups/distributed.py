@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+
+"""
+Distributed run of suites.
+Coordinator is giving suites to remote workers over tcp
+and workers are streaming results back to coordinator.
+Suites are collected on each side and are matched by stable id.
+Record is length prefixed json, port of coordinator is not
+authenticated, so nothing is unpickled or unmarshalled from it.
+"""
+
+from __future__ import absolute_import
+
+import json
+import socket
+import struct
+import logging
+from threading import Lock
+from threading import Thread
+from collections import deque
+
+from .. import channel
+from .. import runnable
+from ..result import ERROR
+from ..xunit import XUnitData
+from ..exceptions import WorkerError
+from ..utils.common import waiting_for
+
+
+logger = logging.getLogger(__name__)
+
+
+HEADER = struct.Struct('!I')
+
+# records of workers are read to memory entirely
+MAX_RECORD_SIZE = 64 * 1024 * 1024
+
+ACCEPT_TIMEOUT = 0.1
+CONNECT_DELAY = 0.5
+
+
+class SocketChannel(object):
+    """
+    Records are framed by length
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.lock = Lock()
+
+    def send(self, record):
+        data = json.dumps(record).encode('utf-8')
+
+        with self.lock:
+            self.sock.sendall(HEADER.pack(len(data)) + data)
+
+    def read(self, size):
+        chunks = []
+
+        while size:
+            chunk = self.sock.recv(size)
+
+            if not chunk:
+                raise EOFError('Connection was closed')
+
+            chunks.append(chunk)
+            size -= len(chunk)
+
+        return b''.join(chunks)
+
+    def receive(self):
+        size, = HEADER.unpack(self.read(HEADER.size))
+
+        if size > MAX_RECORD_SIZE:
+            raise ValueError('Record of size "{}" is too big'.format(size))
+
+        return json.loads(self.read(size).decode('utf-8'))
+
+    def close(self):
+        self.sock.close()
+
+
+def connect(address, timeout=None):
+    def try_connect():
+        try:
+            return socket.create_connection(address)
+        except socket.error:
+            return None
+
+    return waiting_for(
+        try_connect,
+        delay=CONNECT_DELAY,
+        timeout=timeout,
+        message='Can not connect to coordinator "{}:{}"'.format(*address),
+    )
+
+
+def iter_tasks(worker_channel):
+    while True:
+        try:
+            _, key = worker_channel.receive()
+        except EOFError:
+            logger.warning('Coordinator has closed connection')
+            return
+
+        if key is None:
+            return
+
+        yield key
+
+
+class Coordinator(object):
+
+    def __init__(self, result, config, suites):
+        self.lock = Lock()
+        self.result = result
+        self.merger = channel.ResultMerger(
+            result, get_key=runnable.stable_id,
+        )
+
+        self.tasks = deque()
+        self.in_work = 0
+        self.done = 0
+        self.last_done = 0
+
+        for suite in suites:
+            self.merger.match_suite(suite)
+            self.tasks.append(runnable.stable_id(suite))
+
+        self.address = config.COORDINATOR
+        self.release_timeout = config.MULTIPROCESSING_TIMEOUT
+
+        self.server = None
+
+    def __enter__(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(self.address)
+        self.server.listen(5)
+        self.server.settimeout(ACCEPT_TIMEOUT)
+
+        logger.info(
+            'Coordinator is waiting for workers on "{}:{}"'.format(*self.address),
+        )
+
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.server.close()
+
+        with self.lock:
+            self.merger.close()
+
+    def get_task(self):
+        with self.lock:
+            if self.tasks and not self.result.current_state.should_stop:
+                self.in_work += 1
+                return self.tasks.popleft()
+
+            return None
+
+    def release_task(self, key, was_merged):
+        with self.lock:
+            self.in_work -= 1
+
+            # suite of lost worker is given to another one
+            # if nothing from it was merged to result yet
+            if was_merged is False:
+                self.tasks.appendleft(key)
+            else:
+                self.done += 1
+
+    def serve_worker(self, sock, address):
+        worker_channel = SocketChannel(sock)
+
+        key = None
+        was_merged = None
+
+        try:
+            while True:
+                key = self.get_task()
+                was_merged = False
+
+                worker_channel.send((channel.TASK_RECORD, key))
+
+                if key is None:
+                    break
+
+                while True:
+                    record = worker_channel.receive()
+
+                    if record[0] == channel.DONE_RECORD:
+                        break
+
+                    with self.lock:
+                        self.merger.merge(record)
+                        was_merged = True
+
+                self.release_task(key, True)
+                key = None
+        except Exception as error:
+            # connection is closed on any error, otherwise
+            # thread is dead and suite is never released
+            logger.error(
+                'Worker "{}:{}" was lost: {}'.format(address[0], address[1], error),
+                exc_info=not isinstance(error, (socket.error, EOFError)),
+            )
+
+            if key is not None:
+                # rest of partly merged suite is not run by another worker
+                if was_merged:
+                    with self.lock:
+                        self.merger.add_lost(
+                            key, '{}:{}'.format(address[0], address[1]),
+                        )
+
+                self.release_task(key, was_merged)
+        finally:
+            worker_channel.close()
+
+    def accept(self):
+        try:
+            sock, address = self.server.accept()
+        except socket.timeout:
+            return
+
+        logger.info(
+            'Worker "{}:{}" was connected'.format(*address),
+        )
+
+        sock.settimeout(None)
+
+        thread = Thread(target=self.serve_worker, args=(sock, address))
+        thread.daemon = True
+        thread.start()
+
+    def is_running(self):
+        with self.lock:
+            if self.in_work:
+                return True
+
+            return bool(self.tasks) and not self.result.current_state.should_stop
+
+    def is_release(self):
+        self.accept()
+
+        if self.done != self.last_done:
+            self.last_done = self.done
+            return True
+
+        return not self.is_running()
+
+    def serve(self):
+        while self.is_running():
+            waiting_for(
+                self.is_release,
+                timeout=self.release_timeout,
+                message='Workers have not been release suite for "{}" sec.'.format(
+                    self.release_timeout,
+                ),
+            )
+
+
+def send_not_collected(worker_channel, key):
+    logger.error(
+        'Suite "{}" was not collected on worker'.format(key),
+    )
+
+    xunit_data = XUnitData(
+        exc=WorkerError('Suite "{}" was not collected on worker'.format(key)),
+        reason=u'Worker and coordinator have collected different suites.\n',
+        runtime=float(),
+        class_name=key,
+    )
+
+    worker_channel.send(
+        (channel.ADD_RECORD, ERROR, key, xunit_data.to_tuple()),
+    )
+    worker_channel.send((channel.DONE_RECORD,))
+
+
+class CoordinatorSuiteGroup(runnable.RunnableGroup):
+
+    def __run__(self, result):
+        self._is_run = True
+
+        with Coordinator(result, self.config, self.objects) as coordinator:
+            coordinator.serve()
+
+
+class WorkerSuiteGroup(runnable.RunnableGroup):
+
+    def __run__(self, result):
+        self._is_run = True
+
+        suites = dict(
+            (runnable.stable_id(suite), suite) for suite in self.objects
+        )
+
+        worker_channel = SocketChannel(
+            connect(self.config.WORKER, timeout=self.config.MULTIPROCESSING_TIMEOUT),
+        )
+
+        stream = result._stream
+        listeners = list(result.listeners)
+        listener = channel.connect_result(
+            result, worker_channel, get_key=runnable.stable_id,
+        )
+
+        try:
+            for key in iter_tasks(worker_channel):
+                suite = suites.get(key)
+
+                if suite is None:
+                    send_not_collected(worker_channel, key)
+                    continue
+
+                proxies_count = len(result.proxies)
+
+                suite(result)
+
+                for proxy in result.proxies[proxies_count:]:
+                    listener.send_suite(suite, proxy)
+
+                worker_channel.send((channel.DONE_RECORD,))
+        finally:
+            result._stream = stream
+            result.listeners[:] = listeners
+
+            worker_channel.close()
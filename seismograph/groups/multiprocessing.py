@@ -2,128 +2,204 @@
 
 from __future__ import absolute_import
 
+import logging
+
+from .. import channel
 from .. import runnable
-from ..case import CaseBox
-from ..xunit import XUnitData
+from ..utils import pyv
 from ..utils.common import waiting_for
 from ..groups import get_pool_size_of_value
 
 
-MPProcess = mp_manager = None
+logger = logging.getLogger(__name__)
+
+
+MPLock = MPPipe = MPValue = MPQueue = MPProcess = None
 
 
 def import_mp():
-    global MPProcess, mp_manager
+    global MPLock, MPPipe, MPValue, MPQueue, MPProcess
 
+    if MPProcess is not None:
+        return
+
+    from multiprocessing import Lock
+    from multiprocessing import Pipe
+    from multiprocessing import Value
+    from multiprocessing import Queue
     from multiprocessing import Process
-    from multiprocessing import Manager
 
+    MPLock = Lock
+    MPPipe = Pipe
+    MPValue = Value
+    MPQueue = Queue
     MPProcess = Process
-    mp_manager = Manager()
 
 
-def target(suite, mp_result):
-    suite(mp_result)
-    mp_result.save_result()
+def suite_target(suites, tasks, mp_result, done):
+    # Worker is living while task queue has suites.
+    # Suites are inherited from parent process and
+    # only index of suite is going through the queue.
+    listener = mp_result.connect_worker()
 
+    try:
+        for index in iter(tasks.get, None):
+            listener.send_task(suites[index])
+            proxies_count = len(mp_result.proxies)
 
-class MPResult(object):
+            suites[index](mp_result)
+
+            for proxy in mp_result.proxies[proxies_count:]:
+                listener.send_suite(suites[index], proxy)
+
+            with done.get_lock():
+                done.value += 1
+    finally:
+        # writer thread is not joined on exit of process
+        mp_result.close_writer()
+
+    listener.send_stop()
+
+
+def case_target(cases, tasks, mp_result, done):
+    # The same as suite target but for cases of one suite.
+    # Case box is unit of work therefore setup_class and
+    # teardown_class are called once per case class.
+    listener = mp_result.connect_worker()
+
+    try:
+        for index in iter(tasks.get, None):
+            listener.send_task(cases[index])
+
+            with mp_result.proxy() as result_proxy:
+                cases[index](result_proxy)
+
+            with done.get_lock():
+                done.value += 1
+    finally:
+        mp_result.close_writer()
+
+    listener.send_stop()
+
+
+RELEASE_DELAY = 0.1
+
+# Watchdog of worker has this time to interrupt
+# test after timeout, then worker will be killed.
+KILL_DELAY = 5.0
+
+# Worker which is crashed before it has taken task
+# is replaced this number of times in the same slot.
+MAX_RESTARTS = 3
+
+
+class PipeChannel(object):
+    """
+    One way stream of records from workers to parent process
+    """
+
+    def __init__(self):
+        self.lock = MPLock()
+        self.reader, self.writer = MPPipe(duplex=False)
+
+    def send(self, record):
+        data = channel.dumps(record)
+
+        # big message is written to pipe by parts
+        with self.lock:
+            self.writer.send_bytes(data)
 
-    MATCH = {}
+    def receive(self, timeout=0):
+        # waiting for first record only
+        if not self.reader.poll(timeout):
+            return
+
+        yield channel.loads(self.reader.recv_bytes())
+
+        while self.reader.poll():
+            yield channel.loads(self.reader.recv_bytes())
+
+
+class MPResult(object):
 
     def __init__(self, result):
         self.result = result
-        self.queue = mp_manager.Queue()
+        self.channel = PipeChannel()
+        self.merger = channel.ResultMerger(result)
 
-        self.result.support_mp(mp_manager)
+        self.result.support_mp(MPValue('b', lock=False))
 
     def __getattr__(self, item):
         return getattr(self.result, item)
 
-    @staticmethod
-    def pack_result_storage(storage):
-        return [
-            (runnable.id, xunit_data.to_marshal())
-            for runnable, xunit_data in storage
-        ]
-
-    def unpack_result_storage(self, storage):
-        for runnable_id, xunit_data in storage:
-            yield self.MATCH[runnable_id], XUnitData.from_marshal(xunit_data)
-
-    def match(self, suite):
-        self.MATCH[suite.id] = suite
-        suite.support_mp(mp_manager)
-
-        for case in suite:
-            if isinstance(case, CaseBox):
-                for c in case:
-                    self.MATCH[c.id] = c
-                    c.support_mp(mp_manager)
-            else:
-                self.MATCH[case.id] = case
-                case.support_mp(mp_manager)
-
-    def save_result(self):
-        if self.result.proxies:
-            self.queue.put(
-                (
-                    self.result.proxies[0].name,
-                    self.result.proxies[0].runtime,
-
-                    self.pack_result_storage(
-                        self.result.successes,
-                    ),
-                    self.pack_result_storage(
-                        self.result.skipped,
-                    ),
-                    self.pack_result_storage(
-                        self.result.failures,
-                    ),
-                    self.pack_result_storage(
-                        self.result.errors,
-                    ),
-                ),
-            )
-
-    def sync(self):
-        while not self.queue.empty():
-            name, runtime, successes, skipped, failures, errors = self.queue.get()
-
-            result_proxy = self.create_proxy(
-                name=name,
-            )
-            result_proxy.runtime = runtime
-
-            result_proxy.errors.extend(
-                self.unpack_result_storage(errors),
-            )
-            result_proxy.successes.extend(
-                self.unpack_result_storage(successes),
-            )
-            result_proxy.skipped.extend(
-                self.unpack_result_storage(skipped),
-            )
-            result_proxy.failures.extend(
-                self.unpack_result_storage(failures),
-            )
-
-            self.result.extend(result_proxy)
-            self.result.proxies.append(result_proxy)
+    def match_case(self, case):
+        self.merger.match_case(case)
+
+    def match_suite(self, suite):
+        self.merger.match_suite(suite)
+
+    def connect_worker(self):
+        return channel.connect_result(self.result, self.channel)
+
+    def sync(self, timeout=0):
+        for record in self.channel.receive(timeout=timeout):
+            self.merger.merge(record)
+
+    def get_hung(self, pid):
+        return self.merger.get_hung(pid, delay=KILL_DELAY)
+
+    def add_killed(self, pid):
+        self.merger.add_killed(pid, delay=KILL_DELAY)
+
+    def add_crashed(self, pid, exitcode):
+        self.merger.add_crashed(pid, exitcode)
+
+    def add_not_run(self, obj):
+        self.merger.add_unit_not_run(
+            self.merger.get_unit_key(obj),
+            u'Test was not run because workers were crashed.\n',
+        )
+
+    def has_task(self, pid):
+        return pid in self.merger.tasks
+
+    def is_stopped(self, pid):
+        return pid in self.merger.stopped
+
+    def get_stopped_count(self):
+        return len(self.merger.stopped)
+
+    def close(self):
+        self.sync()
+        self.merger.close()
 
 
 class Multiprocessing(object):
 
-    def __init__(self, result, config, suites=None):
-        self.queue = []
-        self.stack = []
+    def __init__(self, result, config, target, pool_size, match=None, objects=None):
+        self.objects = []
+        self.workers = []
+
+        # restarts of worker in slot and pids of handled crashes
+        self.restarts = []
+        self.crashed = set()
+
+        # count of sentinels which were put to queue
+        self.sentinels = 0
+
+        self.tasks = MPQueue()
+        self.done = MPValue('i', 0)
+        self.last_done = 0
+
+        self.match = match
+        self.target = target
+        self.max_processes = pool_size
 
         self.mp_result = MPResult(result)
         self.release_timeout = config.MULTIPROCESSING_TIMEOUT
-        self.max_processes = get_pool_size_of_value(config.ASYNC_SUITES)
 
-        if suites:
-            self.add_suites(suites)
+        if objects:
+            self.add_objects(objects)
 
     def __enter__(self):
         return self
@@ -131,57 +207,163 @@ class Multiprocessing(object):
     def __exit__(self, *args, **kwargs):
         self.terminate_all()
         self.join_all()
-        self.mp_result.sync()
+        self.mp_result.close()
 
-    def add_suite(self, suite):
-        self.mp_result.match(suite)
+    def add_object(self, obj):
+        if self.match:
+            self.match(self.mp_result, obj)
 
-        self.queue.append(
-            MPProcess(
-                target=target,
-                args=(suite, self.mp_result),
-            ),
-        )
+        self.tasks.put(len(self.objects))
+        self.objects.append(obj)
 
-    def add_suites(self, suites):
-        for suite in suites:
-            self.add_suite(suite)
+    def add_objects(self, objects):
+        for obj in objects:
+            self.add_object(obj)
 
-    def try_release(self):
-        for process in self.stack[::-1]:
-            if not process.is_alive():
-                process.join(timeout=self.release_timeout)
-                self.stack.remove(process)
+    def is_alive(self):
+        return any(w.is_alive() for w in self.workers)
 
     def is_release(self):
-        self.try_release()
-        return len(self.stack) < self.max_processes
+        # parent reads channel while workers are running
+        # otherwise worker will be blocked on full pipe
+        self.mp_result.sync(timeout=RELEASE_DELAY)
+
+        if self.kill_hung_workers():
+            return True
+
+        if self.replace_crashed_workers():
+            return True
+
+        if self.done.value != self.last_done:
+            self.last_done = self.done.value
+            return True
+
+        return not self.is_alive()
 
     def wait_release(self):
         waiting_for(
             self.is_release,
             timeout=self.release_timeout,
-            message='Process list has not been release for "{}" sec.'.format(
+            message='Process pool has not been release task for "{}" sec.'.format(
                 self.release_timeout,
             ),
         )
 
+    def kill_hung_workers(self):
+        # Worker is replaced by new one which
+        # continues with remaining tasks.
+        was_killed = False
+
+        for index, worker in enumerate(self.workers):
+            if self.mp_result.get_hung(worker.pid) is None:
+                continue
+
+            worker.terminate()
+            worker.join()
+
+            self.mp_result.add_killed(worker.pid)
+            self.workers[index] = self.start_worker()
+
+            was_killed = True
+
+        return was_killed
+
+    def replace_crashed_workers(self):
+        # Worker which was crashed by segfault, os._exit or
+        # oom killer before it has taken its sentinel from
+        # queue is replaced by new one which takes remaining
+        # tasks and the sentinel.
+        was_crashed = False
+
+        for index, worker in enumerate(self.workers):
+            if worker.exitcode in (0, None) or worker.pid in self.crashed:
+                continue
+
+            self.crashed.add(worker.pid)
+            was_crashed = True
+
+            # records which were sent before crash are merged at first
+            worker.join()
+            self.mp_result.sync()
+
+            has_task = self.mp_result.has_task(worker.pid)
+            is_stopped = self.mp_result.is_stopped(worker.pid)
+
+            self.mp_result.add_crashed(worker.pid, worker.exitcode)
+
+            # queue has no tasks after sentinel of worker
+            if is_stopped:
+                continue
+
+            self.restarts[index] = 0 if has_task else self.restarts[index] + 1
+
+            if self.restarts[index] > MAX_RESTARTS:
+                logger.error(
+                    'Worker was crashed on start {} times, it is not restarted'.format(
+                        self.restarts[index],
+                    ),
+                )
+                continue
+
+            self.workers[index] = self.start_worker()
+            self.put_sentinels()
+
+        return was_crashed
+
+    def put_sentinels(self):
+        # each worker which has not stopped yet is owed one sentinel
+        owed = sum(
+            1 for w in self.workers
+            if w.is_alive() and not self.mp_result.is_stopped(w.pid)
+        )
+
+        while self.sentinels - self.mp_result.get_stopped_count() < owed:
+            self.tasks.put(None)
+            self.sentinels += 1
+
+    def add_not_run_tasks(self):
+        # tasks are left in queue if workers were crashed on start
+        while True:
+            try:
+                index = self.tasks.get(timeout=RELEASE_DELAY)
+            except pyv.Empty:
+                break
+
+            if index is not None:
+                self.mp_result.add_not_run(self.objects[index])
+
     def join_all(self):
-        for process in self.stack:
-            process.join(timeout=self.release_timeout)
+        for worker in self.workers:
+            worker.join(timeout=self.release_timeout)
 
     def terminate_all(self):
-        for process in self.stack:
-            process.terminate()
+        for worker in self.workers:
+            if worker.is_alive():
+                worker.terminate()
+
+    def start_worker(self):
+        worker = MPProcess(
+            target=self.target,
+            args=(self.objects, self.tasks, self.mp_result, self.done),
+        )
+        worker.start()
+
+        return worker
 
     def serve(self):
-        while self.queue:
-            process = self.queue.pop()
-            process.start()
-            self.stack.append(process)
+        for _ in pyv.xrange(min(self.max_processes, len(self.objects))):
+            self.tasks.put(None)
+            self.sentinels += 1
+
+            self.workers.append(self.start_worker())
+            self.restarts.append(0)
+
+        # crash of last worker can be found after end of loop
+        while self.is_alive() or self.replace_crashed_workers():
             self.wait_release()
 
         self.join_all()
+        self.add_not_run_tasks()
 
 
 class MultiprocessingSuiteGroup(runnable.RunnableGroup):
@@ -191,5 +373,28 @@ class MultiprocessingSuiteGroup(runnable.RunnableGroup):
 
         import_mp()
 
-        with Multiprocessing(result, self.config, suites=self.objects) as mp:
+        with Multiprocessing(
+                result,
+                self.config,
+                suite_target,
+                get_pool_size_of_value(self.config.ASYNC_SUITES),
+                match=MPResult.match_suite,
+                objects=self.objects) as mp:
+            mp.serve()
+
+
+class MultiprocessingCaseGroup(runnable.RunnableGroup):
+
+    def __run__(self, result):
+        self._is_run = True
+
+        import_mp()
+
+        with Multiprocessing(
+                result,
+                self.config,
+                case_target,
+                get_pool_size_of_value(self.config.ASYNC_TESTS, in_two=True),
+                match=MPResult.match_case,
+                objects=self.objects) as mp:
             mp.serve()
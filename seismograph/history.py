@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+"""
+Runtime history of suites and cases.
+Is used for starting the longest jobs first.
+"""
+
+import os
+import json
+import logging
+
+from . import runnable
+from .case import CaseBox
+from .suite import Suite
+
+
+logger = logging.getLogger(__name__)
+
+
+SUITES_KEY = 'suites'
+CASES_KEY = 'cases'
+
+
+def get_mean(values):
+    if values:
+        return sum(values) / len(values)
+    return float()
+
+
+class History(object):
+
+    def __init__(self, path=None):
+        self.__path = path
+
+        self.__suites = {}
+        self.__cases = {}
+
+        self.__case_mean = None
+        self.__unit_index = None
+
+        if path and os.path.isfile(path):
+            self.load()
+
+    def __bool__(self):
+        return self.__nonzero__()
+
+    def __nonzero__(self):
+        return bool(self.__suites or self.__cases)
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def suites(self):
+        return self.__suites
+
+    @property
+    def cases(self):
+        return self.__cases
+
+    def load(self):
+        logger.debug(
+            'Load runtime history from "{}"'.format(self.__path),
+        )
+
+        with open(self.__path, 'r') as fp:
+            data = json.load(fp)
+
+        self.__suites.update(data.get(SUITES_KEY, {}))
+        self.__cases.update(data.get(CASES_KEY, {}))
+
+        self.__case_mean = None
+        self.__unit_index = None
+
+    def save(self):
+        logger.debug(
+            'Save runtime history to "{}"'.format(self.__path),
+        )
+
+        with open(self.__path, 'w') as fp:
+            json.dump(
+                {
+                    SUITES_KEY: self.__suites,
+                    CASES_KEY: self.__cases,
+                },
+                fp,
+                indent=2,
+                sort_keys=True,
+            )
+
+    def update(self, result):
+        for storage in (
+                result.errors,
+                result.failures,
+                result.successes):
+            for record in storage:
+                if record.is_case:
+                    self.__cases[record.stable_id] = record.xunit_data.runtime
+
+        for proxy in result.proxies:
+            if proxy.runtime is not None:
+                self.__suites[proxy.name] = round(proxy.runtime, 3)
+
+        self.__case_mean = None
+        self.__unit_index = None
+
+    def get_case_runtime(self, case):
+        if self.__case_mean is None:
+            self.__case_mean = get_mean(list(self.__cases.values()))
+
+        return self.__cases.get(
+            runnable.stable_id(case), self.__case_mean,
+        )
+
+    def get_unit_runtime(self, unit):
+        """
+        Sum of case runtimes by test id of suite,
+        case class or test. Unknown unit has mean runtime.
+        """
+        if self.__unit_index is None:
+            self.__unit_index = {}
+
+            for case_id, runtime in self.__cases.items():
+                suite_name, _, test_path = case_id.partition(':')
+                class_name, _, _ = test_path.partition('.')
+
+                for key in set((suite_name, '{}:{}'.format(suite_name, class_name), case_id)):
+                    self.__unit_index[key] = self.__unit_index.get(key, float()) + runtime
+
+        if self.__case_mean is None:
+            self.__case_mean = get_mean(list(self.__cases.values()))
+
+        return self.__unit_index.get(unit, self.__case_mean)
+
+    def weight(self, obj):
+        """
+        Expected runtime of suite, case box or case.
+        Unknown case has mean runtime of known cases.
+        """
+        if isinstance(obj, CaseBox):
+            return sum(self.get_case_runtime(c) for c in obj)
+
+        if isinstance(obj, Suite):
+            runtime = self.__suites.get(runnable.stable_id(obj))
+
+            if runtime is None:
+                return sum(self.weight(c) for c in obj)
+
+            return runtime
+
+        return self.get_case_runtime(obj)
+
+    def sort(self, objects):
+        """
+        Longest first. Can be used instead of shuffle.
+        """
+        objects.sort(key=self.weight, reverse=True)
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+
+"""
+Test impact analysis.
+Source files which were executed by each test are recorded
+to index of cache directory. Tests which were affected by
+changed files are selected by index on next runs.
+"""
+
+import os
+import sys
+import glob
+import json
+import hashlib
+import logging
+import subprocess
+from threading import Lock
+
+from . import runnable
+from .exceptions import ConfigError
+
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_KEY = 'impact'
+PARTIAL_FILE_PATTERN = 'impact.{}.jsonl'
+
+PACKAGE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+
+_recorder = None
+
+
+def get_digest(path):
+    try:
+        with open(path, 'rb') as fp:
+            return hashlib.sha1(fp.read()).hexdigest()
+    except (IOError, OSError):
+        return None
+
+
+def get_project_path(file_path, root):
+    """
+    Path of file relative to root or None
+    if file is not a source of project.
+    """
+    file_path = os.path.abspath(file_path)
+
+    if not file_path.startswith(root + os.sep):
+        return None
+
+    if file_path.startswith(PACKAGE_PATH + os.sep):
+        return None
+
+    if 'site-packages' in file_path.split(os.sep):
+        return None
+
+    if not os.path.isfile(file_path):
+        return None
+
+    return os.path.relpath(file_path, root)
+
+
+def get_changed_files(value, root=None):
+    """
+    Value is comma separated files or git revisions.
+    Revision is passed to "git diff" as is, therefore
+    it can be range or commit to compare with work tree.
+    """
+    root = root or os.getcwd()
+    changed = set()
+
+    for item in (i.strip() for i in value.split(',')):
+        if not item:
+            continue
+
+        if os.path.exists(item):
+            changed.add(os.path.relpath(os.path.abspath(item), root))
+            continue
+
+        try:
+            top_level = subprocess.check_output(
+                ['git', 'rev-parse', '--show-toplevel'],
+            ).decode('utf-8').strip()
+            output = subprocess.check_output(
+                ['git', 'diff', '--name-only', item],
+            ).decode('utf-8')
+        except (OSError, subprocess.CalledProcessError) as error:
+            raise ConfigError(
+                'can not get changed files of "{}" by git: {}'.format(item, error),
+            )
+
+        for line in filter(None, output.splitlines()):
+            changed.add(
+                os.path.relpath(os.path.join(top_level, line), root),
+            )
+
+    return changed
+
+
+class ImpactIndex(object):
+    """
+    Test id to source files and source file to its digest
+    on the moment when tests were recorded.
+    """
+
+    def __init__(self, files=None, tests=None):
+        self.files = files or {}
+        self.tests = tests or {}
+
+    def __bool__(self):
+        return bool(self.tests)
+
+    __nonzero__ = __bool__
+
+    @classmethod
+    def load(cls, storage):
+        data = storage.get(INDEX_KEY, {})
+        return cls(files=data.get('files'), tests=data.get('tests'))
+
+    def save(self, storage):
+        storage.set(
+            INDEX_KEY, {'files': self.files, 'tests': self.tests},
+        )
+
+    def is_fresh(self, test_id, get_current_digest):
+        if test_id not in self.tests:
+            return False
+
+        return all(
+            get_current_digest(f) == self.files.get(f)
+            for f in self.tests[test_id]
+        )
+
+    def update(self, recorded, get_current_digest):
+        changed = set(
+            f for f in set().union(*recorded.values())
+            if get_current_digest(f) != self.files.get(f)
+        )
+
+        # Recording of test was made with old version of changed file.
+        # Test is unknown until it will be recorded again.
+        for test_id, files in list(self.tests.items()):
+            if test_id not in recorded and changed.intersection(files):
+                del self.tests[test_id]
+
+        for test_id, files in recorded.items():
+            self.tests[test_id] = sorted(files)
+
+        self.files = dict(
+            (f, get_current_digest(f) if f in changed else self.files[f])
+            for f in set().union(*self.tests.values())
+        )
+
+    def get_affected(self, test_ids, changed_files):
+        """
+        Tests which have executed one of changed files.
+        Tests without recording are affected always.
+        """
+        changed_files = set(changed_files)
+
+        return [
+            test_id for test_id in test_ids
+            if test_id not in self.tests
+            or changed_files.intersection(self.tests[test_id])
+        ]
+
+
+class Tracer(object):
+    """
+    Collects file names of executed functions
+    in current thread while context is opened.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.files = set()
+
+        self.__previous = None
+
+    def __enter__(self):
+        if self.callback is None:
+            return self
+
+        self.__previous = sys.gettrace()
+
+        files = self.files
+        previous = self.__previous
+
+        def trace(frame, event, arg):
+            files.add(frame.f_code.co_filename)
+
+            if previous is not None:
+                return previous(frame, event, arg)
+
+            # local events are not needed
+            return None
+
+        sys.settrace(trace)
+
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        if self.callback is None:
+            return
+
+        sys.settrace(self.__previous)
+        self.callback(self.files)
+
+
+class Recorder(object):
+    """
+    Worker process of multiprocessing mode is appending
+    its records to partial file, owner of recorder merges
+    partial files to index on save.
+    """
+
+    def __init__(self, storage, root=None):
+        self.storage = storage
+        self.root = root or os.getcwd()
+        self.index = ImpactIndex.load(storage)
+
+        self.pid = os.getpid()
+        self.lock = Lock()
+
+        self.recorded = {}
+        self.digests = {}
+
+    def get_current_digest(self, path):
+        if path not in self.digests:
+            self.digests[path] = get_digest(os.path.join(self.root, path))
+
+        return self.digests[path]
+
+    def need_record(self, test_id):
+        return not self.index.is_fresh(test_id, self.get_current_digest)
+
+    def get_partial_path(self, pid):
+        return os.path.join(
+            self.storage.path, PARTIAL_FILE_PATTERN.format(pid),
+        )
+
+    def record(self, test_id, file_names):
+        files = set(
+            filter(None, (get_project_path(f, self.root) for f in file_names)),
+        )
+
+        with self.lock:
+            if os.getpid() != self.pid:
+                if not os.path.isdir(self.storage.path):
+                    os.makedirs(self.storage.path)
+
+                with open(self.get_partial_path(os.getpid()), 'a') as fp:
+                    fp.write(json.dumps([test_id, sorted(files)]) + '\n')
+            else:
+                self.recorded.setdefault(test_id, set()).update(files)
+
+    def load_partial_files(self):
+        for path in glob.glob(self.get_partial_path('*')):
+            with open(path, 'r') as fp:
+                for line in fp:
+                    try:
+                        test_id, files = json.loads(line)
+                    except ValueError:
+                        # last line of killed worker
+                        continue
+
+                    self.recorded.setdefault(test_id, set()).update(files)
+
+            os.remove(path)
+
+    def trace(self, case):
+        test_id = runnable.stable_id(case)
+
+        if not self.need_record(test_id):
+            return Tracer()
+
+        return Tracer(
+            callback=lambda files: self.record(test_id, files),
+        )
+
+    def save(self):
+        self.load_partial_files()
+
+        if not self.recorded:
+            return
+
+        logger.debug(
+            'Save impact of {} tests'.format(len(self.recorded)),
+        )
+
+        self.index.update(self.recorded, self.get_current_digest)
+        self.index.save(self.storage)
+
+
+def start_recording(storage):
+    global _recorder
+    _recorder = Recorder(storage)
+
+
+def stop_recording():
+    global _recorder
+
+    if _recorder is not None:
+        _recorder.save()
+
+    _recorder = None
+
+
+def trace(case):
+    if _recorder is None:
+        return Tracer()
+
+    return _recorder.trace(case)
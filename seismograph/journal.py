@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+
+"""
+Journal of results. Records are appended to binary file
+while tests are running. Journals of shards and workers
+can be merged and can be replayed to reports, history and
+cache without run of tests, result of crashed run too.
+Record is length prefixed json of list. Reasons of failures
+are rendered and are written on close of journal.
+
+Usage:
+    seismograph journal merge -o <output> <journal> [<journal> ...]
+    seismograph journal replay <journal> [<journal> ...] [options]
+"""
+
+import os
+import sys
+import json
+import time
+import struct
+import logging
+from threading import Lock
+from optparse import OptionParser
+
+from . import cache
+from . import config
+from . import history
+from .result import FAIL
+from .result import ERROR
+from .result import Result
+from .result import ResultRecord
+from .result import ResultListener
+from .exceptions import ConfigError
+from .exceptions import JournalError
+
+
+logger = logging.getLogger(__name__)
+
+
+MAGIC = b'SGJ1'
+
+# length of record in bytes
+HEADER = struct.Struct('>I')
+
+RUN_RECORD = 0
+ADD_RECORD = 1
+SUITE_RECORD = 2
+REASON_RECORD = 3
+
+# reason of failure is written on close of journal
+NOT_WRITTEN_REASON = u'Reason was not written to journal, run was not finished.\n'
+
+COMMANDS = ('merge', 'replay')
+
+
+class JournalWriter(object):
+
+    def __init__(self, path, append=True):
+        self.path = path
+        self.lock = Lock()
+
+        self.fp = open(path, 'ab' if append else 'wb')
+        self.fp.seek(0, os.SEEK_END)
+
+        if not self.fp.tell():
+            self.fp.write(MAGIC)
+
+    def write(self, record):
+        data = json.dumps(record).encode('utf-8')
+
+        with self.lock:
+            # record is flushed at once for recovery of crashed run
+            self.fp.write(HEADER.pack(len(data)) + data)
+            self.fp.flush()
+
+    def close(self):
+        self.fp.close()
+
+
+def read_journal(path):
+    with open(path, 'rb') as fp:
+        magic = fp.read(len(MAGIC))
+
+        # file was created by run which was crashed at once
+        if not magic:
+            return
+
+        if magic != MAGIC:
+            raise JournalError(
+                '"{}" is not result journal'.format(path),
+            )
+
+        while True:
+            header = fp.read(HEADER.size)
+
+            if not header:
+                break
+
+            data = b''
+
+            if len(header) == HEADER.size:
+                size, = HEADER.unpack(header)
+                data = fp.read(size)
+
+            if len(header) < HEADER.size or len(data) < size:
+                logger.warning(
+                    'Last record of journal "{}" is broken'.format(path),
+                )
+                break
+
+            yield json.loads(data.decode('utf-8'))
+
+
+class JournalRun(object):
+    """
+    Records of one run. Item is name of suite proxy or None
+    for result itself and tuple of result record.
+    """
+
+    def __init__(self, name=None):
+        self.name = name
+
+        self.items = []
+        self.suites = {}
+
+    def records(self):
+        yield (RUN_RECORD, self.name, os.getpid(), time.time())
+
+        for suite_name, record in self.items:
+            yield (ADD_RECORD, suite_name, record)
+
+        for suite_name, runtime in sorted(self.suites.items()):
+            yield (SUITE_RECORD, suite_name, runtime)
+
+
+def load_runs(paths):
+    runs = []
+
+    for path in paths:
+        run = None
+
+        # stable id to xunit data of item which is waiting for reason
+        pending = {}
+
+        for record in read_journal(path):
+            if record[0] == RUN_RECORD or run is None:
+                run = JournalRun(
+                    name=record[1] if record[0] == RUN_RECORD else None,
+                )
+                runs.append(run)
+                pending = {}
+
+            if record[0] == ADD_RECORD:
+                run.items.append((record[1], record[2]))
+
+                status, stable_id, xunit_data = record[2][0], record[2][1], record[2][4]
+
+                if status in (ERROR, FAIL) and xunit_data[0] is None:
+                    xunit_data[0] = NOT_WRITTEN_REASON
+                    pending[stable_id] = xunit_data
+            elif record[0] == SUITE_RECORD:
+                run.suites[record[1]] = record[2]
+            elif record[0] == REASON_RECORD and record[1] in pending:
+                pending.pop(record[1])[0] = record[2]
+
+    return runs
+
+
+def merge_runs(runs):
+    """
+    Record of test from later run replaces records of the test
+    from earlier runs. Runtime of suite is sum of runtimes from
+    runs which are still having results of the suite.
+    """
+    latest = {}
+
+    for index, run in enumerate(runs):
+        for _, record in run.items:
+            latest[record[1]] = index
+
+    merged = JournalRun(
+        name=next((r.name for r in runs if r.name), None),
+    )
+
+    for index, run in enumerate(runs):
+        kept = set()
+
+        for suite_name, record in run.items:
+            if latest[record[1]] == index:
+                merged.items.append((suite_name, record))
+                kept.add(suite_name)
+
+        for suite_name, runtime in run.suites.items():
+            if suite_name in kept and runtime is not None:
+                merged.suites[suite_name] = round(
+                    merged.suites.get(suite_name, float()) + runtime, 3,
+                )
+
+    return merged
+
+
+def merge(paths, output):
+    run = merge_runs(load_runs(paths))
+
+    # journals are read before output can be truncated
+    writer = JournalWriter(output, append=False)
+
+    try:
+        for record in run.records():
+            writer.write(record)
+    finally:
+        writer.close()
+
+    return run
+
+
+def replay(paths, replay_config, stream=None):
+    """
+    Result is filled by merged records and is reported
+    like result of program. Runtime of result is sum
+    of runtimes of tests.
+    """
+    run = merge_runs(load_runs(paths))
+    result = Result(replay_config, name=run.name, stream=stream)
+
+    proxies = {}
+    suite_names = []
+
+    with result:
+        for suite_name, item in run.items:
+            record = ResultRecord.from_tuple(item)
+
+            if suite_name is None:
+                result.add_record(record)
+                continue
+
+            if suite_name not in proxies:
+                proxies[suite_name] = result.create_proxy(name=suite_name)
+                suite_names.append(suite_name)
+
+            proxies[suite_name].add_record(record)
+
+        for suite_name in suite_names:
+            proxy = proxies[suite_name]
+            proxy.runtime = run.suites.get(suite_name)
+
+            result.extend(proxy)
+            result.proxies.append(proxy)
+            proxy.console.flush()
+
+    if replay_config.HISTORY_FILE:
+        runtime_history = history.History(replay_config.HISTORY_FILE)
+        runtime_history.update(result)
+        runtime_history.save()
+
+    if replay_config.CACHE_DIR:
+        cache.update_last_failed(replay_config, result)
+
+    return result
+
+
+class JournalListener(ResultListener):
+    """
+    Appends results to journal while tests are running.
+    Results of workers are coming to owner of result.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.writer = None
+
+        # snapshots of reasons are rendered on final, not by tests
+        self.snapshots = []
+
+    def on_begin(self, result):
+        self.writer = JournalWriter(self.path)
+        self.writer.write(
+            (RUN_RECORD, result.name, os.getpid(), time.time()),
+        )
+
+    def on_add(self, result, status, runnable_object, xunit_data):
+        if self.writer is None:
+            return
+
+        record = ResultRecord(status, runnable_object, xunit_data)
+
+        self.writer.write(
+            (
+                ADD_RECORD,
+                result.name if result.is_proxy else None,
+                record.to_tuple(render=False),
+            ),
+        )
+
+        if not xunit_data.is_rendered:
+            self.snapshots.append((record.stable_id, xunit_data))
+
+    def on_final(self, result):
+        if self.writer is None:
+            return
+
+        for stable_id, xunit_data in self.snapshots:
+            self.writer.write(
+                (REASON_RECORD, stable_id, xunit_data.reason),
+            )
+
+        self.snapshots = []
+
+        for proxy in result.proxies:
+            if proxy.runtime is not None:
+                self.writer.write(
+                    (SUITE_RECORD, proxy.name, round(proxy.runtime, 3)),
+                )
+
+        self.writer.close()
+        self.writer = None
+
+
+def create_merge_parser():
+    parser = OptionParser(
+        'seismograph journal merge -o <output> <journal> [<journal> ...]',
+    )
+    parser.add_option(
+        '-o', '--output',
+        dest='OUTPUT',
+        default=None,
+        help='Path to journal to write merged records in.',
+    )
+
+    return parser
+
+
+def create_replay_parser():
+    parser = config.create_option_parser()
+    parser.set_usage(
+        'seismograph journal replay <journal> [<journal> ...] [options]',
+    )
+
+    return parser
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+
+    if not argv or argv[0] not in COMMANDS:
+        sys.stderr.write(__doc__.lstrip())
+        sys.exit(2)
+
+    command = argv.pop(0)
+
+    if command == 'merge':
+        parser = create_merge_parser()
+    else:
+        parser = create_replay_parser()
+
+    options, paths = parser.parse_args(argv)
+
+    if not paths:
+        parser.error('journal is required')
+
+    try:
+        if command == 'merge':
+            if not options.OUTPUT:
+                parser.error('path to output is required')
+
+            merge(paths, options.OUTPUT)
+            return
+
+        replay_config = config.Config(options=options)
+        config.prepare_config(replay_config)
+
+        result = replay(paths, replay_config)
+    except (IOError, OSError, ConfigError, JournalError) as error:
+        parser.error(error)
+
+    sys.exit(not result.current_state.was_success)
@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 
 import os
+import ast
 import sys
 import time
 import logging
 from random import randint
 from importlib import import_module
 
+from .utils import pyv
+from .utils.common import measure_time
 from .exceptions import LoaderError
 
 
@@ -35,10 +38,12 @@ def is_py_module(file_name):
         and file_name.endswith('.py')
 
 
+def get_full_module_name(module_name, package=None):
+    return '{}{}'.format(package + '.' if package else '', module_name)
+
+
 def load_module(module_name, package=None):
-    module_name = '{}{}'.format(
-        package + '.' if package else '', module_name,
-    )
+    module_name = get_full_module_name(module_name, package=package)
 
     logger.debug('Load module "{}"'.format(module_name))
 
@@ -66,19 +71,20 @@ def load_test_names_from_case(
         cls,
         test_name_prefix=None,
         default_test_name=None):
-    def is_test_name(name):
-        return name.startswith((test_name_prefix or TEST_NAME_PREFIX)) \
-            or \
-            name == (default_test_name or DEFAULT_TEST_NAME)
-
-    for name in sorted(dir(cls)):
-        if is_test_name(name):
-            logger.debug(
-                'Load test "{}" from case "{}.{}"'.format(
-                    name, cls.__module__, cls.__name__,
-                ),
-            )
-            yield name
+    # table of names is cached by meta class of case
+    test_names = type(cls).get_test_names(
+        cls,
+        test_name_prefix or TEST_NAME_PREFIX,
+        default_test_name or DEFAULT_TEST_NAME,
+    )
+
+    logger.debug(
+        'Load tests {} from case "{}.{}"'.format(
+            test_names, cls.__module__, cls.__name__,
+        ),
+    )
+
+    return iter(test_names)
 
 
 def load_tests_from_case(
@@ -95,19 +101,19 @@ def load_tests_from_case(
     )
 
     if method_name:
-        for name in filter(lambda n: n == method_name, dir(cls)):
-            case = cls(name, config=config)
-            if box_class:
-                yield box_class((case, ))
-            else:
-                yield case
-            raise StopIteration
-        else:
+        if not hasattr(cls, method_name):
             raise LoaderError(
                 'Test "{}" not found in "{}"'.format(
                     method_name, cls.__name__,
                 ),
             )
+
+        case = cls(method_name, config=config)
+
+        if box_class:
+            yield box_class((case, ))
+        else:
+            yield case
     else:
         names = load_test_names_from_case(
             cls,
@@ -129,14 +135,31 @@ def load_tests_from_case(
                 yield cls(name, config=config)
 
 
+def index_suites(suites):
+    """
+    Suite by name. First suite is found
+    by name if names are duplicated.
+    """
+    index = {}
+
+    for suite in suites:
+        index.setdefault(suite.name, suite)
+
+    return index
+
+
 def load_suite_by_name(name, suites):
+    return load_suite_from_index(name, index_suites(suites))
+
+
+def load_suite_from_index(name, index):
     logger.debug(
         'Load suite "{}" from list'.format(name),
     )
 
-    for suite in filter(lambda s: s.name == name, suites):
-        return suite
-    else:
+    try:
+        return index[name]
+    except KeyError:
         raise LoaderError(
             'Suite "{}" not found'.format(name),
         )
@@ -149,9 +172,9 @@ def load_case_from_suite(class_name, suite):
         ),
     )
 
-    for case_cls in filter(lambda c: c.__name__ == class_name, suite.cases):
-        return case_cls
-    else:
+    try:
+        return suite.cases_by_name[class_name]
+    except KeyError:
         raise LoaderError(
             'Test case "{}" not found'.format(class_name),
         )
@@ -170,7 +193,67 @@ def load_suites_from_module(module, suite_class):
             yield value
 
 
-def load_suites_from_path(path_to_dir, suite_class, package=None, recursive=True):
+def get_string_value(node, module_name):
+    if isinstance(node, ast.Name) and node.id == '__name__':
+        return module_name
+
+    value = getattr(node, 'value', getattr(node, 's', None))
+
+    if isinstance(value, pyv.basestring):
+        return value
+
+    return None
+
+
+def scan_suite_names(file_path, module_name):
+    """
+    Names of suites which are defined in module without its import.
+    None is returned if module can not be described by static scan:
+    suites were not found, name of suite is not literal or module
+    is registering cases to suite of another module.
+    """
+    try:
+        with open(file_path, 'rb') as fp:
+            tree = ast.parse(fp.read(), filename=file_path)
+    except (SyntaxError, ValueError):
+        return None
+
+    suite_names = set()
+    suite_variables = set()
+    registered_to = set()
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Call):
+            func = node.value.func
+            func_name = getattr(func, 'id', getattr(func, 'attr', ''))
+
+            if not func_name.endswith('Suite'):
+                continue
+
+            args = node.value.args or [k.value for k in node.value.keywords if k.arg == 'name']
+            suite_name = get_string_value(args[0], module_name) if args else None
+
+            if suite_name is None:
+                return None
+
+            suite_names.add(suite_name)
+            suite_variables.update(
+                t.id for t in node.targets if isinstance(t, ast.Name)
+            )
+        elif isinstance(node, ast.Attribute) and node.attr == 'register':
+            registered_to.add(getattr(node.value, 'id', None))
+
+    if not suite_names or not registered_to.issubset(suite_variables):
+        return None
+
+    return suite_names
+
+
+def iter_modules_from_path(path_to_dir, package=None, recursive=True):
+    """
+    Path to file, name of module and package
+    of each module which can have suites
+    """
     logger.debug(
         'Load suites from path "{}"'.format(path_to_dir),
     )
@@ -180,25 +263,48 @@ def load_suites_from_path(path_to_dir, suite_class, package=None, recursive=True
     lst_dir = os.listdir(path_to_dir)
     full_path = lambda *n: os.path.join(path_to_dir, *n)
 
-    modules = (n.replace('.py', '') for n in lst_dir if is_py_module(n))
+    modules = (n for n in lst_dir if is_py_module(n))
 
-    for module_name in modules:
-        module = load_module(module_name, package=package)
-
-        for suite in load_suites_from_module(module, suite_class):
-            yield suite
+    for file_name in modules:
+        yield full_path(file_name), file_name.replace('.py', ''), package
 
     if recursive:
         packs = (n for n in lst_dir if is_package(full_path(n)))
 
         for pack in packs:
 
-            for suite in load_suites_from_path(
+            for module_info in iter_modules_from_path(
                     full_path(pack),
-                    suite_class,
                     recursive=recursive,
                     package='{}.{}'.format(package, pack) if package else pack):
-                yield suite
+                yield module_info
+
+
+def load_suites_from_path(path_to_dir,
+                          suite_class,
+                          package=None,
+                          recursive=True,
+                          manifest=None):
+    modules = iter_modules_from_path(
+        path_to_dir, package=package, recursive=recursive,
+    )
+
+    for file_path, module_name, module_package in modules:
+        if manifest and not manifest.need_import(
+                file_path, get_full_module_name(module_name, module_package)):
+            continue
+
+        timer = measure_time()
+        module = load_module(module_name, package=module_package)
+        import_time = timer()
+
+        suites = list(load_suites_from_module(module, suite_class))
+
+        if manifest:
+            manifest.add_module(file_path, module, suites, import_time=import_time)
+
+        for suite in suites:
+            yield suite
 
 
 def load_separated_classes_for_flows(case_cls):
@@ -0,0 +1,447 @@
+# -*- coding: utf-8 -*-
+
+"""
+Manifest of collection is stored to cache directory.
+Module of suites path is described by its suites and
+is checked by mtime and size or digest of file.
+Selection by commands does not import modules which
+define suites out of selection only. Static scan of
+source is used for modules which are not described.
+Tree and report of collection are printed from
+descriptions of unchanged modules without import.
+"""
+
+import os
+import sys
+import json
+import logging
+
+from . import case
+from . import loader
+from . import collector
+from . import runnable
+from .exceptions import LoaderError
+from .impact import get_digest
+
+
+logger = logging.getLogger(__name__)
+
+
+MANIFEST_KEY = 'collection'
+
+
+def get_skip_reason(obj):
+    # names of attributes can be changed by configure
+    if hasattr(obj, case.SKIP_ATTRIBUTE_NAME):
+        return getattr(obj, case.SKIP_WHY_ATTRIBUTE_NAME, 'no reason')
+    return None
+
+
+def get_flows_count(case_class):
+    flows = case_class.__flows__
+    return len(flows) if isinstance(flows, (list, tuple)) else 0
+
+
+def get_case_require(case_class):
+    mount_data = getattr(case_class, '__mount_data__', None)
+    require = list(mount_data.require or []) if mount_data else []
+    require.extend(case_class.__require__ or [])
+    return require
+
+
+def describe_case(case_class):
+    tests = list(loader.load_test_names_from_case(case_class))
+
+    skipped_tests = {}
+    docs = {}
+
+    for test_name in tests:
+        method = getattr(case_class, test_name)
+        reason = get_skip_reason(method)
+
+        if reason is not None:
+            skipped_tests[test_name] = reason
+
+        if method.__doc__:
+            docs[test_name] = method.__doc__
+
+    return {
+        'name': case_class.__name__,
+        'doc': case_class.__doc__,
+        'tests': tests,
+        'docs': docs,
+        'flows': get_flows_count(case_class),
+        'skip': get_skip_reason(case_class),
+        'skipped_tests': skipped_tests,
+        'require': get_case_require(case_class),
+    }
+
+
+def describe_suite(suite):
+    return {
+        'require': list(suite.context.require),
+        'cases': [describe_case(case_class) for case_class in suite.cases],
+    }
+
+
+def describe_file(file_path, entry=None):
+    stat = os.stat(file_path)
+
+    # digest is computed again if file was touched only
+    if entry and (entry['mtime'], entry['size']) == (stat.st_mtime, stat.st_size):
+        digest = entry['digest']
+    else:
+        digest = get_digest(file_path)
+
+    return {
+        'mtime': stat.st_mtime,
+        'size': stat.st_size,
+        'digest': digest,
+    }
+
+
+def describe_loaded(loaded, suites, entries=None):
+    """
+    Suite is belonging to module if suite is attribute of module
+    or case class of module is registered to suite.
+    """
+    entries = entries or {}
+
+    suites = list(suites)
+    suites_of_modules = {}
+
+    for suite in suites:
+        for case_class in suite.cases:
+            suites_of_modules.setdefault(case_class.__module__, set()).add(suite.name)
+
+    modules = {}
+    loaded_suites = set()
+
+    for file_path, (module_name, suite_names) in loaded.items():
+        suite_names = set(suite_names)
+        suite_names.update(suites_of_modules.get(module_name, ()))
+
+        entry = describe_file(file_path, entry=entries.get(file_path))
+        entry['module'] = module_name
+        entry['suites'] = sorted(suite_names)
+
+        modules[file_path] = entry
+        loaded_suites.update(suite_names)
+
+    descriptions = dict(
+        (suite.name, describe_suite(suite))
+        for suite in suites
+        if suite.name in loaded_suites
+    )
+
+    return modules, descriptions
+
+
+def discover_modules(modules, suite_class):
+    """
+    Target of discovery process.
+    Modules are imported and are described.
+    """
+    loaded = {}
+    suites = []
+
+    for file_path, module_name, package in modules:
+        try:
+            module = loader.load_module(module_name, package=package)
+        except (Exception, LoaderError):
+            # error is raised by import in main process
+            logger.debug(
+                'Discovery of "{}" was failed'.format(file_path), exc_info=True,
+            )
+            continue
+
+        module_suites = list(loader.load_suites_from_module(module, suite_class))
+
+        loaded[os.path.normpath(file_path)] = (
+            module.__name__, [s.name for s in module_suites],
+        )
+        suites.extend(s for s in module_suites if s not in suites)
+
+    return describe_loaded(loaded, suites)
+
+
+def discover_target(args):
+    return discover_modules(*args)
+
+
+def describe_test(case_instance):
+    method = getattr(case_instance, runnable.method_name(case_instance))
+
+    return {
+        'id': runnable.stable_id(case_instance),
+        'flows': get_flows_count(case_instance),
+        'skip': get_skip_reason(method) or get_skip_reason(case_instance),
+        'require': list(case_instance.context.require),
+    }
+
+
+def describe_import_times(import_times):
+    return sorted(
+        (
+            {'module': module_name, 'import_time': import_time}
+            for module_name, import_time in (import_times or {}).items()
+        ),
+        key=lambda m: -m['import_time'],
+    )
+
+
+def create_report(suites, import_times=None):
+    """
+    Report of collection for external tools.
+    Suites should be built.
+    """
+    tests = []
+    suites_report = []
+
+    for suite in suites:
+        suites_report.append({
+            'name': suite.name,
+            'build_time': suite.build_time,
+            'require': list(suite.context.require),
+        })
+
+        for case_instance in suite:
+            if isinstance(case_instance, case.CaseBox):
+                tests.extend(describe_test(c) for c in case_instance)
+            else:
+                tests.append(describe_test(case_instance))
+
+    return {
+        'tests': tests,
+        'suites': suites_report,
+        'modules': describe_import_times(import_times),
+    }
+
+
+def create_described_report(descriptions, commands=None, import_times=None):
+    """
+    Report of collection by descriptions of suites.
+    Suites are not built, so build time is unknown.
+    """
+    tests = []
+    suites_report = []
+
+    for suite_name, description in sorted(descriptions.items()):
+        suites_report.append({
+            'name': suite_name,
+            'build_time': None,
+            'require': description['require'],
+        })
+
+        for case_description in description['cases']:
+            for test_name in case_description['tests']:
+                test_id = '{}:{}.{}'.format(suite_name, case_description['name'], test_name)
+
+                if commands and not any(collector.is_of_command(test_id, c) for c in commands):
+                    continue
+
+                tests.append({
+                    'id': test_id,
+                    'flows': case_description['flows'],
+                    'skip': case_description['skipped_tests'].get(test_name) or case_description['skip'],
+                    'require': case_description['require'],
+                })
+
+    return {
+        'tests': tests,
+        'suites': suites_report,
+        'modules': describe_import_times(import_times),
+    }
+
+
+def print_report(report, stream=None):
+    stream = stream or sys.stdout
+
+    json.dump(
+        report,
+        stream,
+        indent=2,
+        sort_keys=True,
+    )
+    stream.write('\n')
+
+
+class CollectionManifest(object):
+
+    def __init__(self, storage, selected=None, use_descriptions=False):
+        self.storage = storage
+
+        # suites of fresh modules are not imported, but are
+        # taken from descriptions, it's used by tree and report
+        self.use_descriptions = use_descriptions and bool(storage)
+
+        # names of suites which are required by commands,
+        # None is meaning that all of suites are required.
+        self.selected = set(selected) if selected is not None else None
+
+        # manifest without storage is not saved
+        data = storage.get(MANIFEST_KEY, {}) if storage else {}
+
+        self.modules = data.get('modules', {})
+        self.suites = data.get('suites', {})
+
+        # file path to name of module and names of its suites
+        self.loaded = {}
+        self.skipped = []
+        self.described = []
+
+        # name of module to time of its import
+        self.import_times = {}
+
+    def is_fresh(self, file_path):
+        entry = self.modules.get(file_path)
+
+        if entry is None:
+            return False
+
+        actual = describe_file(file_path, entry=entry)
+
+        if actual['digest'] != entry['digest']:
+            return False
+
+        entry.update(actual)
+
+        return True
+
+    def need_import(self, file_path, module_name):
+        file_path = os.path.normpath(file_path)
+
+        if self.selected is None and not self.use_descriptions:
+            return True
+
+        is_fresh = self.is_fresh(file_path)
+
+        # Static scan is used for new and changed modules,
+        # manifest entry of them is not updated in this case.
+        if is_fresh:
+            suite_names = self.modules[file_path]['suites']
+        elif self.selected is None:
+            return True
+        else:
+            suite_names = loader.scan_suite_names(file_path, module_name)
+
+        # module without suites can be imported for side effects
+        if not suite_names:
+            return True
+
+        if self.selected is not None and not self.selected.intersection(suite_names):
+            logger.debug(
+                'Skip import of "{}" by collection manifest'.format(file_path),
+            )
+
+            self.skipped.append(file_path)
+
+            return False
+
+        if is_fresh and self.use_descriptions and all(n in self.suites for n in suite_names):
+            logger.debug(
+                'Describe "{}" by collection manifest'.format(file_path),
+            )
+
+            self.described.append(file_path)
+
+            return False
+
+        return True
+
+    def discover(self, path, suite_class, processes, recursive=True):
+        """
+        Modules which can not be described by manifest
+        or static scan are imported by pool of processes
+        and only their entries are merged to manifest.
+        """
+        if self.selected is None and not self.use_descriptions:
+            return
+
+        modules = []
+
+        for file_path, module_name, package in loader.iter_modules_from_path(
+                path, recursive=recursive):
+            if self.is_fresh(os.path.normpath(file_path)):
+                continue
+
+            full_name = loader.get_full_module_name(module_name, package)
+
+            if loader.scan_suite_names(file_path, full_name) is not None:
+                continue
+
+            modules.append((file_path, module_name, package))
+
+        if not modules:
+            return
+
+        logger.debug(
+            'Discover {} modules in {} processes'.format(len(modules), processes),
+        )
+
+        from multiprocessing import Pool
+
+        pool = Pool(processes)
+
+        try:
+            for entries, descriptions in pool.imap_unordered(
+                    discover_target,
+                    [([module_info], suite_class) for module_info in modules]):
+                self.modules.update(entries)
+                self.suites.update(descriptions)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def add_module(self, file_path, module, suites, import_time=None):
+        self.loaded[os.path.normpath(file_path)] = (
+            module.__name__, [s.name for s in suites],
+        )
+
+        if import_time is not None:
+            self.import_times[module.__name__] = import_time
+
+    def update(self, suites):
+        modules, descriptions = describe_loaded(self.loaded, suites, entries=self.modules)
+
+        self.modules.update(modules)
+        self.suites.update(descriptions)
+
+        for file_path in [p for p in self.modules if not os.path.isfile(p)]:
+            del self.modules[file_path]
+
+        used = set()
+
+        for entry in self.modules.values():
+            used.update(entry['suites'])
+
+        for suite_name in [n for n in self.suites if n not in used]:
+            del self.suites[suite_name]
+
+    def get_descriptions(self, suites):
+        """
+        Descriptions of suites of described modules and
+        of loaded suites, loaded suite is described again.
+        """
+        descriptions = {}
+
+        for file_path in self.described:
+            for suite_name in self.modules[file_path]['suites']:
+                if self.selected is None or suite_name in self.selected:
+                    descriptions[suite_name] = self.suites[suite_name]
+
+        for suite in suites:
+            descriptions[suite.name] = describe_suite(suite)
+
+        return descriptions
+
+    def save(self):
+        logger.debug(
+            'Save collection manifest, {} modules were imported, {} were skipped'.format(
+                len(self.loaded), len(self.skipped),
+            ),
+        )
+
+        self.storage.set(
+            MANIFEST_KEY, {'modules': self.modules, 'suites': self.suites},
+        )
@@ -180,6 +180,11 @@ class Program(runnable.RunnableObject):
         if self.suites_path:
             self.load_suites()
 
+        # some of modules were not imported, so tree
+        # and report are printed from collection manifest
+        if self.__descriptions is not None:
+            return self.print_descriptions()
+
         if not self.__suites and not self.__scripts:
             raise RuntimeError(
                 'No suites or scripts for execution',
@@ -193,8 +198,33 @@ class Program(runnable.RunnableObject):
             from .tree import print_tree
             print_tree(self.__suites)
 
+        if self.__config.COLLECT_ONLY:
+            from . import manifest
+            manifest.print_report(
+                manifest.create_report(self.__suites, import_times=self.__import_times),
+            )
+
+            if self.__exit:
+                sys.exit(0)
+
+            return True
+
+        if self.__config.PROGRESS:
+            from . import progress
+
+            # count of tests should be known before run
+            self.__suites = list(self.__suites)
+            self.__result.add_listener(
+                progress.create_listener(self.__suites, self.__config),
+            )
+
         group = self._make_group()
 
+        if self.__config.RECORD_IMPACT and not self.__config.NO_TESTS:
+            from . import cache
+            from . import impact
+            impact.start_recording(cache.Cache(self.__config.CACHE_DIR))
+
         with self.__result:
             try:
                 self.__context.on_run(self)
@@ -215,6 +245,17 @@ class Program(runnable.RunnableObject):
                     self, tb, timer(), error,
                 )
 
+        if self.__config.HISTORY_FILE:
+            self.save_history(self.__config.HISTORY_FILE)
+
+        if self.__config.CACHE_DIR and not self.__config.NO_TESTS:
+            from . import cache
+            cache.update_last_failed(self.__config, self.__result)
+
+        if self.__config.RECORD_IMPACT and not self.__config.NO_TESTS:
+            from . import impact
+            impact.stop_recording()
+
         if self.__exit:
             sys.exit(not self.__result.current_state.was_success)
 
@@ -245,6 +286,8 @@ class Program(runnable.RunnableObject):
 
         self.__suites = []
         self.__scripts = []
+        self.__import_times = {}
+        self.__descriptions = None
         self.__exit = exit
         self.__is_run = False
         self.__stream = stream
@@ -260,7 +303,7 @@ class Program(runnable.RunnableObject):
         parser = config.create_option_parser()
         self.__context.on_option_parser(parser)
 
-        for extension in ext.TO_INIT:
+        for extension in ext.load_extensions():
             extensions.add_options(extension, parser)
 
         if require:
@@ -288,7 +331,7 @@ class Program(runnable.RunnableObject):
             from .case import set_no_skip
             set_no_skip()
 
-        for extension in ext.TO_INIT:
+        for extension in ext.load_extensions():
             extensions.install(extension, self)
 
         if suites:
@@ -337,6 +380,28 @@ class Program(runnable.RunnableObject):
                 self.__suites, self.__config,
             )
 
+        if self.config.WORKER:
+            logger.debug(
+                'Use "WorkerSuiteGroup" to making suite group',
+            )
+
+            from .groups.distributed import WorkerSuiteGroup
+
+            return WorkerSuiteGroup(
+                self.__suites, self.__config,
+            )
+
+        if self.config.COORDINATOR:
+            logger.debug(
+                'Use "CoordinatorSuiteGroup" to making suite group',
+            )
+
+            from .groups.distributed import CoordinatorSuiteGroup
+
+            return CoordinatorSuiteGroup(
+                self.__suites, self.__config,
+            )
+
         if self.config.GEVENT:
             logger.debug(
                 'Use "GeventSuiteGroup" to making suite group',
@@ -359,6 +424,15 @@ class Program(runnable.RunnableObject):
                 self.__suites, self.__config,
             )
 
+        if self.config.MULTIPROCESSING_CASES:
+            logger.debug(
+                'Use "DefaultSuiteGroup" to making suite group. Cases will be distributed to processes.',
+            )
+
+            return DefaultSuiteGroup(
+                self.__suites, self.__config,
+            )
+
         if self.config.MULTIPROCESSING:
             logger.debug(
                 'Use "MultiprocessingSuiteGroup" to making suite group',
@@ -391,11 +465,19 @@ class Program(runnable.RunnableObject):
         else:
             stream = sys.stdout
 
-        return self.__result_class__(
+        result = self.__result_class__(
             self.__config,
             stream=stream,
         )
 
+        if self.__config.RESULT_JOURNAL:
+            from . import journal
+            result.add_listener(
+                journal.JournalListener(self.__config.RESULT_JOURNAL),
+            )
+
+        return result
+
     def ext(self, name):
         if name not in self.__context.require:
             raise ExtensionNotRequired(name)
@@ -431,16 +513,19 @@ class Program(runnable.RunnableObject):
         )
 
     def suite_is_valid(self, suite):
+        return self.suite_name_is_valid(suite.name)
+
+    def suite_name_is_valid(self, suite_name):
         is_valid = True
 
         if self.__config.INCLUDE_SUITES_PATTERN:
             is_valid = bool(
-                re.search(self.__config.INCLUDE_SUITES_PATTERN, suite.name),
+                re.search(self.__config.INCLUDE_SUITES_PATTERN, suite_name),
             )
 
         if self.__config.EXCLUDE_SUITE_PATTERN:
             is_valid = not bool(
-                re.search(self.__config.EXCLUDE_SUITE_PATTERN, suite.name),
+                re.search(self.__config.EXCLUDE_SUITE_PATTERN, suite_name),
             )
 
         return is_valid
@@ -486,14 +571,93 @@ class Program(runnable.RunnableObject):
                 if path not in sys.path:
                     sys.path.append(path)
 
+                collection_manifest = self.create_manifest()
+
+                if self.__config.PARALLEL_DISCOVERY:
+                    collection_manifest.discover(
+                        path,
+                        self.__suite_class__,
+                        self.__config.PARALLEL_DISCOVERY,
+                        recursive=self.recursive_load,
+                    )
+
                 self.register_suites(
                     loader.load_suites_from_path(
                         path,
                         self.__suite_class__,
                         recursive=self.recursive_load,
+                        manifest=collection_manifest,
                     ),
                 )
 
+                self.__import_times = collection_manifest.import_times
+
+                if collection_manifest.storage:
+                    collection_manifest.update(self.__suites)
+                    collection_manifest.save()
+
+                if collection_manifest.described:
+                    self.__descriptions = dict(
+                        (suite_name, description)
+                        for suite_name, description
+                        in collection_manifest.get_descriptions(self.__suites).items()
+                        if self.suite_name_is_valid(suite_name)
+                    )
+
+    def create_manifest(self):
+        from . import cache
+        from . import manifest
+
+        storage = None
+
+        if self.__config.CACHE_DIR:
+            storage = cache.Cache(self.__config.CACHE_DIR)
+
+        selected = None
+
+        # modules are selected by names of suites from commands,
+        # all of suites are needed for other filters of collection.
+        if self.__config.TESTS:
+            selected = [
+                collector.get_suite_name_from_command(c) for c in self.__config.TESTS
+            ]
+
+        # other filters of collection need loaded suites
+        use_descriptions = (self.__config.TREE or self.__config.COLLECT_ONLY) and not (
+            self.__config.LAST_FAILED or self.__config.AFFECTED_BY or self.__config.SHARD
+        )
+
+        return manifest.CollectionManifest(
+            storage, selected=selected, use_descriptions=use_descriptions,
+        )
+
+    def print_descriptions(self):
+        from . import manifest
+
+        if self.__config.TREE:
+            from .tree import print_described_tree
+            print_described_tree(self.__descriptions)
+
+        manifest.print_report(
+            manifest.create_described_report(
+                self.__descriptions,
+                commands=self.__config.TESTS,
+                import_times=self.__import_times,
+            ),
+        )
+
+        if self.__exit:
+            sys.exit(0)
+
+        return True
+
+    def save_history(self, path):
+        from . import history
+
+        runtime_history = history.History(path)
+        runtime_history.update(self.__result)
+        runtime_history.save()
+
     def run_scripts(self, result=None, run_point=None):
         if run_point:
             scripts = filter(
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""
+Live progress of run. Listener only appends results to list,
+line is rendered by ticker thread with interval, so there is
+no lock on result of test. ETA is computed by runtime history
+of tests which were done, by count of tests without history.
+"""
+
+import sys
+import time
+import logging
+from threading import Event
+from threading import Thread
+
+from . import history
+from . import runnable
+from .case import Case
+from .case import CaseBox
+from .result import FAIL
+from .result import SKIP
+from .result import ERROR
+from .result import SUCCESS
+from .result import ResultListener
+
+
+logger = logging.getLogger(__name__)
+
+
+# seconds between lines on terminal and in file
+TTY_INTERVAL = 1.0
+INTERVAL = 10.0
+
+LINE_FORMAT = (
+    u'{done}/{total} passed={passed} failed={failed} errors={errors} '
+    u'skipped={skipped} {speed:.1f} tests/sec ETA {eta}'
+)
+
+
+def iter_cases(suites):
+    for suite in suites:
+        for case in suite:
+            if isinstance(case, CaseBox):
+                for c in case:
+                    yield c
+            else:
+                yield case
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return u'-'
+
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    return u'{}:{:02d}:{:02d}'.format(hours, minutes, seconds)
+
+
+def is_tty(stream):
+    isatty = getattr(stream, 'isatty', None)
+    return bool(isatty and isatty())
+
+
+class ProgressListener(ResultListener):
+
+    def __init__(self, cases, runtime_history=None, stream=None, interval=None):
+        self.stream = stream or sys.stderr
+        self.is_tty = is_tty(self.stream)
+        self.interval = interval or (TTY_INTERVAL if self.is_tty else INTERVAL)
+
+        # expected runtime by stable id of case
+        self.expected = {}
+
+        if runtime_history:
+            for case in cases:
+                self.expected[runnable.stable_id(case)] = runtime_history.get_case_runtime(case)
+        else:
+            self.expected.update((runnable.stable_id(c), None) for c in cases)
+
+        self.total = len(cases)
+        self.total_runtime = sum(r or float() for r in self.expected.values())
+
+        # appending to list is thread safe, items are read by ticker only
+        self.items = []
+
+        self.counts = dict.fromkeys((SUCCESS, FAIL, ERROR, SKIP), 0)
+        self.done_runtime = float()
+        self.rendered = 0
+
+        self.started = None
+        self.stopped = Event()
+        self.ticker = None
+
+    def on_begin(self, result):
+        self.started = time.time()
+
+        self.ticker = Thread(target=self.tick)
+        self.ticker.daemon = True
+        self.ticker.start()
+
+    def on_add(self, result, status, runnable_object, xunit_data):
+        if isinstance(runnable_object, Case):
+            self.items.append(
+                (status, self.expected.get(runnable.stable_id(runnable_object))),
+            )
+
+    def on_final(self, result):
+        if self.ticker is None:
+            return
+
+        self.stopped.set()
+        self.ticker.join()
+        self.ticker = None
+
+        self.write(self.render(), final=True)
+
+    def tick(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.write(self.render())
+            except BaseException as error:
+                logger.debug(error, exc_info=True)
+
+    def get_eta(self, done, elapsed):
+        if self.total_runtime and self.done_runtime:
+            # history is scaled by speed of current run
+            return max(
+                elapsed * (self.total_runtime - self.done_runtime) / self.done_runtime, 0,
+            )
+
+        if done:
+            return max(elapsed * (self.total - done) / done, 0)
+
+        return None
+
+    def render(self):
+        done = len(self.items)
+
+        for status, runtime in self.items[self.rendered:done]:
+            self.counts[status] += 1
+            self.done_runtime += runtime or float()
+
+        self.rendered = done
+
+        elapsed = time.time() - self.started
+
+        return LINE_FORMAT.format(
+            done=done,
+            total=self.total,
+            passed=self.counts[SUCCESS],
+            failed=self.counts[FAIL],
+            errors=self.counts[ERROR],
+            skipped=self.counts[SKIP],
+            speed=done / elapsed if elapsed else float(),
+            eta=format_seconds(self.get_eta(done, elapsed)),
+        )
+
+    def write(self, line, final=False):
+        if self.is_tty:
+            # line is rewritten in place until end of run
+            self.stream.write(u'\r{}\x1b[K'.format(line))
+
+            if final:
+                self.stream.write(u'\n')
+        else:
+            self.stream.write(u'{}\n'.format(line))
+
+        self.stream.flush()
+
+
+def create_listener(suites, config, stream=None):
+    runtime_history = None
+
+    if config.HISTORY_FILE:
+        runtime_history = history.History(config.HISTORY_FILE)
+
+    return ProgressListener(
+        list(iter_cases(suites)), runtime_history=runtime_history, stream=stream,
+    )
@@ -62,22 +62,68 @@ class Reason(object):
         return u'\n'.join(tmp)
 
 
+class Snapshot(object):
+    """
+    State of runnable object which was taken at failure time.
+    Text is rendered by first call and is kept after that.
+    """
+
+    __slots__ = ('__render', '__args', '__text')
+
+    def __init__(self, render, *args):
+        self.__render = render
+        self.__args = args
+        self.__text = None
+
+    def __call__(self):
+        if self.__render is not None:
+            self.__text = pyv.unicode_string(self.__render(*self.__args))
+            # captured state is not needed after render
+            self.__render = self.__args = None
+
+        return self.__text
+
+
 def create(runnable_object, reason, config=None):
     return Reason(runnable_object, reason, config)
 
 
+def capture(runnable_object, traceback):
+    """
+    Cheap capture of reason at failure time.
+    Reason is rendered on first call of returned snapshot.
+    """
+    if runnable_object.__create_reason__:
+        return Snapshot(
+            join, runnable.snapshot_reason(runnable_object), traceback,
+        )
+
+    return Snapshot(join, traceback)
+
+
 def item(name, desc, *args):
     return u'{} ({}): \n{}\n\n'.format(
         name, desc, u'\n'.join(u'  {}'.format(s) for s in args),
     )
 
 
+def storage_item(name, desc, items):
+    if not items:
+        return u''
+
+    return item(
+        name, desc, *(u'{}: {}'.format(k, v) for k, v in items)
+    )
+
+
 def join(*args):
     def gen(item):
         for i in item:
             if isinstance(i, (list, tuple)):
                 for ni in gen(i):
                     yield pyv.unicode_string(ni)
+            elif isinstance(i, Snapshot):
+                yield i()
             else:
                 yield pyv.unicode_string(i)
 
@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
 
+import os
 import sys
 import logging
+import weakref
+from itertools import count
 from threading import Lock
+from threading import Thread
+from collections import OrderedDict
 from contextlib import contextmanager
 
 from . import xunit
@@ -10,10 +15,10 @@ from . import reason
 from . import runnable
 from .utils import pyv
 from .utils import colors
+from .case import Case
 from .utils.mp import MPSupportedValue
 
 
-lock = Lock()
 logger = logging.getLogger(__name__)
 
 
@@ -21,6 +26,26 @@ DEFAULT_NAME = 'seismograph'
 START_MESSAGE = 'Seismograph is measuring'
 
 
+ERROR = 'error'
+FAIL = 'fail'
+SKIP = 'skip'
+SUCCESS = 'success'
+
+STORAGE_NAMES = {
+    ERROR: 'errors',
+    FAIL: 'failures',
+    SKIP: 'skipped',
+    SUCCESS: 'successes',
+}
+
+XUNIT_TAGS = {
+    ERROR: xunit.ERROR_TAG,
+    FAIL: xunit.FAILURE_TAG,
+    SKIP: xunit.SKIPPED_TAG,
+    SUCCESS: None,
+}
+
+
 def get_runnable_from_storage_item(item):
     runnable_object, _ = item
     return runnable_object
@@ -38,6 +63,10 @@ def get_last_item_from_storage(storage):
 
 
 def get_xunit_data_from_storage(storage, runnable_object):
+    if isinstance(storage, ResultStorage):
+        item = storage.get(runnable_object)
+        return get_xunit_data_from_storage_item(item) if item else None
+
     for item in storage:
         if get_runnable_from_storage_item(item) == runnable_object:
             return get_xunit_data_from_storage_item(item)
@@ -47,6 +76,9 @@ def get_xunit_data_from_storage(storage, runnable_object):
 def reset_item_of_storage(storage, runnable_object, xunit_data):
     assert isinstance(xunit_data, xunit.XUnitData)
 
+    if isinstance(storage, ResultStorage):
+        return storage.reset(runnable_object, xunit_data)
+
     for item in storage:
         if get_runnable_from_storage_item(item) == runnable_object:
             storage.remove(item)
@@ -57,12 +89,308 @@ def reset_item_of_storage(storage, runnable_object, xunit_data):
 
 
 def get_runtime_from_storage(storage):
+    if isinstance(storage, ResultStorage):
+        return storage.runtime
+
     rt = float()
     for item in storage:
         rt += get_xunit_data_from_storage_item(item).runtime
     return rt
 
 
+def create_reference(obj):
+    try:
+        return weakref.ref(obj)
+    except TypeError:
+        return lambda: obj
+
+
+class ResultRecord(object):
+    """
+    Item of result storage. Runnable object is referenced weakly,
+    so case can be released after run, record keeps data of it
+    which are needed after run. Record is unpacked like tuple of
+    runnable object and xunit data.
+    """
+
+    __slots__ = (
+        'status',
+        'is_case',
+        'stable_id',
+        'xunit_data',
+        'description',
+        '_reference',
+    )
+
+    def __init__(self, status, runnable_object, xunit_data):
+        self.status = status
+        self.is_case = isinstance(runnable_object, Case)
+        self.stable_id = runnable.stable_id(runnable_object)
+        self.xunit_data = xunit_data
+
+        # representation is needed for report of reasons only
+        if status in (ERROR, FAIL):
+            self.description = repr(runnable_object)
+        else:
+            self.description = None
+
+        self._reference = create_reference(runnable_object)
+
+    @classmethod
+    def from_tuple(cls, tpl):
+        """
+        Record of object which is not existing in current process.
+        """
+        record = cls.__new__(cls)
+
+        record.status = tpl[0]
+        record.stable_id = tpl[1]
+        record.is_case = tpl[2]
+        record.description = tpl[3]
+        record.xunit_data = xunit.XUnitData.from_tuple(tpl[4])
+        record._reference = lambda: None
+
+        return record
+
+    def to_tuple(self, render=True):
+        return (
+            self.status,
+            self.stable_id,
+            self.is_case,
+            self.description,
+            self.xunit_data.to_tuple(render=render),
+        )
+
+    def __iter__(self):
+        return iter((self.runnable_object, self.xunit_data))
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, index):
+        return (self.runnable_object, self.xunit_data)[index]
+
+    def __repr__(self):
+        if self.description:
+            return self.description
+
+        return '<{}: {}>'.format(self.__class__.__name__, self.stable_id)
+
+    @property
+    def runnable_object(self):
+        """
+        None if object was released
+        """
+        return self._reference()
+
+
+class ResultTotals(object):
+    """
+    Count and runtime of items of all storages of result.
+    Totals are changed by storages, so state of result
+    does not go through storages on each call.
+    """
+
+    __slots__ = ('tests', 'runtime')
+
+    def __init__(self):
+        self.tests = 0
+        self.runtime = float()
+
+
+class ResultStorage(object):
+    """
+    Items of result in order of adding.
+    Items are indexed by stable id of runnable object
+    because layers can get and reset them on each test.
+    Runtime of items is counted on changes of storage.
+    """
+
+    def __init__(self, status=None, items=None, totals=None, locked=True):
+        self.status = status
+        self.totals = totals
+
+        # number of adding to record
+        self.__items = OrderedDict()
+        # stable id to numbers of its items
+        self.__index = {}
+        self.__counter = count()
+        self.__runtime = float()
+
+        # Storage of proxy which is owned by one case
+        # is not locked, storages of suites and result
+        # are extended by proxies from different threads.
+        self.__lock = Lock() if locked else None
+
+        if items:
+            self.extend(items)
+
+    def __iter__(self):
+        return iter(self.__items.values())
+
+    def __len__(self):
+        return len(self.__items)
+
+    def __bool__(self):
+        return bool(self.__items)
+
+    __nonzero__ = __bool__
+
+    def __getitem__(self, index):
+        if index in (-1, len(self.__items) - 1) and self.__items:
+            return self.__items[next(reversed(self.__items))]
+
+        return list(self.__items.values())[index]
+
+    def __repr__(self):
+        return '<{}: {}>'.format(self.__class__.__name__, list(self))
+
+    @property
+    def runtime(self):
+        return self.__runtime
+
+    def __append(self, item):
+        if not isinstance(item, ResultRecord):
+            item = ResultRecord(self.status, *item)
+
+        number = next(self.__counter)
+
+        self.__items[number] = item
+        self.__index.setdefault(item.stable_id, []).append(number)
+
+        self.__runtime += item.xunit_data.runtime
+
+        if self.totals is not None:
+            self.totals.tests += 1
+            self.totals.runtime += item.xunit_data.runtime
+
+    def __extend(self, items):
+        for item in items:
+            self.__append(item)
+
+    def append(self, item):
+        if self.__lock is None:
+            return self.__append(item)
+
+        with self.__lock:
+            self.__append(item)
+
+    def extend(self, items):
+        if self.__lock is None:
+            return self.__extend(items)
+
+        with self.__lock:
+            self.__extend(items)
+
+    def find(self, runnable_object):
+        """
+        Number of first item of runnable object or None.
+        Objects with the same stable id are compared like in list.
+        """
+        for number in self.__index.get(runnable.stable_id(runnable_object), ()):
+            if self.__items[number].runnable_object == runnable_object:
+                return number
+
+        return None
+
+    def get(self, runnable_object):
+        number = self.find(runnable_object)
+
+        if number is None:
+            return None
+
+        return self.__items[number]
+
+    def __reset(self, runnable_object, xunit_data):
+        number = self.find(runnable_object)
+
+        if number is None:
+            return False
+
+        record = self.__items.pop(number)
+        self.__index[record.stable_id].remove(number)
+        self.__runtime -= record.xunit_data.runtime
+
+        if self.totals is not None:
+            self.totals.tests -= 1
+            self.totals.runtime -= record.xunit_data.runtime
+
+        self.__append(ResultRecord(record.status, runnable_object, xunit_data))
+
+        return True
+
+    def reset(self, runnable_object, xunit_data):
+        if self.__lock is None:
+            return self.__reset(runnable_object, xunit_data)
+
+        with self.__lock:
+            return self.__reset(runnable_object, xunit_data)
+
+
+def write_to_stream(stream, string):
+    stream.write(string)
+    stream.flush()
+
+
+class OutputWriter(object):
+    """
+    Output of workers is written to streams by one thread.
+    Each flush of console is one string, so output
+    of workers is not mixed and workers do not wait
+    for each other on stream.
+    """
+
+    def __init__(self):
+        self.__queue = None
+        self.__thread = None
+        self.__pid = None
+        self.__closed = False
+
+    def start(self):
+        self.__pid = os.getpid()
+        self.__queue = pyv.Queue()
+
+        self.__thread = Thread(target=self.run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def run(self):
+        while True:
+            item = self.__queue.get()
+
+            if item is None:
+                break
+
+            try:
+                write_to_stream(*item)
+            except Exception:
+                logger.error('Output was not written', exc_info=True)
+
+    def write(self, stream, string):
+        if self.__closed:
+            write_to_stream(stream, string)
+            return
+
+        # thread of writer is not copied to forked process
+        if self.__pid != os.getpid():
+            self.start()
+
+        self.__queue.put((stream, string))
+
+    def close(self):
+        """
+        Output is written on close
+        and is written by caller after that.
+        """
+        self.__closed = True
+
+        if self.__thread is not None and self.__pid == os.getpid():
+            self.__queue.put(None)
+            self.__thread.join()
+
+        self.__thread = None
+
+
 class CaptureStream(object):
 
     def __init__(self):
@@ -76,12 +404,10 @@ class CaptureStream(object):
 
     def flush(self, fp=None):
         if fp and self.__buffer:
-            with lock:
-                fp.write('\nLogging capture:\n\n')
-                for s in self.__buffer:
-                    fp.write(s)
-                    fp.flush()
-            self.__buffer = []
+            buffer, self.__buffer = self.__buffer, []
+            write_to_stream(
+                fp, u'\nLogging capture:\n\n' + u''.join(buffer),
+            )
 
 
 class LogCapture(object):
@@ -177,17 +503,19 @@ class Console(object):
             yield
             self.__tabs = current_tabs
 
+        def release(self):
+            buffer, self.__buffer = self.__buffer, []
+            return u''.join(buffer)
+
         def flush(self, stream):
-            stream.write(
-                u''.join(self.__buffer),
-            )
-            self.__buffer = []
+            stream.write(self.release())
 
-    def __init__(self, stream=None, verbose=False):
+    def __init__(self, stream=None, verbose=False, writer=None):
         self.__buffer = []
         self.__children = []
 
         self.__verbose = verbose
+        self.__writer = writer
         self.__stream = stream or sys.stdout
 
     def __call__(self, string):
@@ -200,16 +528,16 @@ class Console(object):
         return child_console
 
     def flush(self):
-        with lock:
-            self.__stream.write(
-                u''.join(self.__buffer),
-            )
-            for child in self.__children:
-                child.flush(self.__stream)
+        buffer, self.__buffer = self.__buffer, []
 
-            self.__stream.flush()
+        string = u''.join(
+            [u''.join(buffer)] + [child.release() for child in self.__children],
+        )
 
-        self.__buffer = []
+        if self.__writer is not None:
+            self.__writer.write(self.__stream, string)
+        else:
+            write_to_stream(self.__stream, string)
 
     def write(self, string):
         self.__buffer.append(string)
@@ -275,20 +603,77 @@ class Markers(object):
             return colors.red(self.SMALL_ERROR)
 
 
+class ResultListener(object):
+    """
+    Listener is called by result and by all of the result proxies.
+    """
+
+    def on_begin(self, result):
+        pass
+
+    def on_start(self, result, runnable_object):
+        pass
+
+    def on_add(self, result, status, runnable_object, xunit_data):
+        pass
+
+    def on_final(self, result):
+        pass
+
+
+class XUnitStreamListener(ResultListener):
+    """
+    Writes xunit report while tests are running.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.stream = None
+        self.lock = Lock()
+
+    def on_begin(self, result):
+        self.stream = xunit.XUnitStream(self.file_path, result.name)
+
+    def on_add(self, result, status, runnable_object, xunit_data):
+        if self.stream is None:
+            return
+
+        with self.lock:
+            self.stream.add(
+                result.name, xunit_data, tag_name=XUNIT_TAGS[status],
+            )
+
+    def on_final(self, result):
+        if self.stream is None:
+            return
+
+        state = result.current_state
+
+        self.stream.close(
+            totals={
+                'tests': state.tests,
+                'time': state.runtime,
+                'skip': state.skipped,
+                'errors': state.errors,
+                'failures': state.failures,
+            },
+        )
+        self.stream = None
+
+
 class State(object):
 
     def __init__(self, result, should_stop=False):
         self.__result = result
         self.__should_stop = MPSupportedValue(should_stop)
 
-    def support_mp(self, manager):
-        self.__should_stop.set(
-            manager.Value('b', self.should_stop)
-        )
+    def support_mp(self, shared_value):
+        shared_value.value = self.should_stop
+        self.__should_stop.set(shared_value)
 
     @property
     def should_stop(self):
-        return self.__should_stop.value
+        return bool(self.__should_stop.value)
 
     @should_stop.setter
     def should_stop(self, value):
@@ -303,20 +688,11 @@ class State(object):
         if self.__result.runtime is not None:
             return round(self.__result.runtime, xunit.ROUND_RUNTIME)
 
-        runtime = float()
-
-        for storage in (
-                self.__result.errors,
-                self.__result.skipped,
-                self.__result.failures,
-                self.__result.successes):
-            runtime += get_runtime_from_storage(storage)
-
-        return round(runtime, xunit.ROUND_RUNTIME)
+        return round(self.__result.totals.runtime, xunit.ROUND_RUNTIME)
 
     @property
     def tests(self):
-        return self.errors + self.successes + self.failures + self.skipped
+        return self.__result.totals.tests
 
     @property
     def errors(self):
@@ -343,11 +719,24 @@ class Result(object):
 
     __marker_class__ = Markers
 
-    def __init__(self, config, name=None, stream=None, current_state=None, is_proxy=False):
-        self.errors = []
-        self.skipped = []
-        self.failures = []
-        self.successes = []
+    def __init__(self,
+                 config,
+                 name=None,
+                 stream=None,
+                 listeners=None,
+                 current_state=None,
+                 is_proxy=False,
+                 writer=None,
+                 single_owner=False):
+        self.totals = ResultTotals()
+
+        # result which is changed by one thread only is not locked
+        locked = not single_owner
+
+        self.errors = ResultStorage(status=ERROR, totals=self.totals, locked=locked)
+        self.skipped = ResultStorage(status=SKIP, totals=self.totals, locked=locked)
+        self.failures = ResultStorage(status=FAIL, totals=self.totals, locked=locked)
+        self.successes = ResultStorage(status=SUCCESS, totals=self.totals, locked=locked)
 
         self.proxies = []
 
@@ -355,32 +744,33 @@ class Result(object):
         self.__is_proxy = is_proxy
         self.__name = name or DEFAULT_NAME
         self.__current_state = current_state or State(self)
+        self.__listeners = listeners if listeners is not None else []
 
         self._stream = stream or sys.stdout
         self._marker = self.__marker_class__(self.__config)
 
         self.__timer = None
+        self.__state = None
         self.__runtime = None
         self.__capture = None
+
+        if not is_proxy and self.__config.THREADING:
+            writer = OutputWriter()
+
+        self.__writer = writer
         self.__console = Console(
             self._stream,
             verbose=self.__config.VERBOSE,
+            writer=writer,
         )
 
         if not is_proxy:
-            global lock
-
             self.__capture = LogCapture(config)
 
-            if self.__config.GEVENT:
-                from gevent.lock import Semaphore
-
-                lock = Semaphore()
-
-            if self.__config.MULTIPROCESSING:
-                from multiprocessing import Lock
-
-                lock = Lock()
+            if self.__config.XUNIT_STREAM:
+                self.__listeners.append(
+                    XUnitStreamListener(self.__config.XUNIT_REPORT),
+                )
 
     def __enter__(self):
         self.begin()
@@ -389,7 +779,7 @@ class Result(object):
     def __exit__(self, *args, **kwargs):
         self.final()
 
-        if self.__config.XUNIT_REPORT:
+        if self.__config.XUNIT_REPORT and not self.__config.XUNIT_STREAM:
             self.create_report(self.__config.XUNIT_REPORT)
 
     def __repr__(self):
@@ -434,8 +824,17 @@ class Result(object):
     def current_state(self):
         return self.__current_state
 
-    def support_mp(self, manager):
-        self.__current_state.support_mp(manager)
+    @property
+    def listeners(self):
+        return self.__listeners
+
+    def add_listener(self, listener):
+        assert isinstance(listener, ResultListener), \
+            'listener should be instance of ResultListener'
+        self.__listeners.append(listener)
+
+    def support_mp(self, shared_value):
+        self.__current_state.support_mp(shared_value)
 
     def set_timer(self, timer):
         self.__timer = timer
@@ -447,10 +846,15 @@ class Result(object):
     def create_proxy(self, **kwargs):
         logger.debug('Create proxy to result')
 
+        # proxy of case is named as proxy of its suite
+        kwargs.setdefault('name', self.__name)
+
         return self.__class__(
             self.__config,
             is_proxy=True,
             stream=self._stream,
+            writer=self.__writer,
+            listeners=self.__listeners,
             current_state=self.__current_state,
             **kwargs
         )
@@ -485,7 +889,8 @@ class Result(object):
 
             self.proxies.append(proxy)
         else:
-            proxy = self.create_proxy()
+            # proxy without object is used by caller only
+            proxy = self.create_proxy(single_owner=True)
 
         try:
             yield proxy
@@ -494,10 +899,25 @@ class Result(object):
             self.extend(proxy)
             proxy.console.flush()
 
+    def close_writer(self):
+        """
+        Output which is waiting for writer is written.
+        Forked worker closes own writer before exit.
+        """
+        if self.__writer is not None:
+            self.__writer.close()
+
     def get_state(self):
-        return State(
-            self, should_stop=self.__current_state.should_stop,
-        )
+        # state is reading totals of result, so it is created once
+        if self.__state is None:
+            self.__state = State(self)
+
+        should_stop = self.__current_state.should_stop
+
+        if self.__state.should_stop != should_stop:
+            self.__state.should_stop = should_stop
+
+        return self.__state
 
     def get_fail_by(self, runnable_object):
         return get_xunit_data_from_storage(self.failures, runnable_object)
@@ -524,38 +944,30 @@ class Result(object):
         return reset_item_of_storage(self.successes, runnable_object, xunit_data)
 
     def add_error(self, runnable_object, traceback, runtime, exc):
-        error_reason = reason.create(
-            runnable_object, traceback, config=self.__config,
-        )
-
         xunit_data = xunit.XUnitData(
             exc=exc,
             runtime=runtime,
-            reason=reason.format_reason(error_reason),
+            reason=reason.capture(runnable_object, traceback),
             class_name=runnable.class_name(runnable_object),
             method_name=runnable.stopped_on(runnable_object),
         )
 
-        self.errors.append((runnable_object, xunit_data))
+        self.add_item(ERROR, runnable_object, xunit_data)
         self.finish(self._marker.error())
 
         if self.__config.STOP:
             self.__current_state.should_stop = True
 
     def add_fail(self, runnable_object, traceback, runtime, exc):
-        fail_reason = reason.create(
-            runnable_object, traceback, config=self.__config,
-        )
-
         xunit_data = xunit.XUnitData(
             exc=exc,
             runtime=runtime,
-            reason=reason.format_reason(fail_reason),
+            reason=reason.capture(runnable_object, traceback),
             class_name=runnable.class_name(runnable_object),
             method_name=runnable.stopped_on(runnable_object),
         )
 
-        self.failures.append((runnable_object, xunit_data))
+        self.add_item(FAIL, runnable_object, xunit_data)
         self.finish(self._marker.fail())
 
         if self.__config.STOP:
@@ -568,7 +980,7 @@ class Result(object):
             method_name=runnable.method_name(runnable_object),
         )
 
-        self.successes.append((runnable_object, xunit_data))
+        self.add_item(SUCCESS, runnable_object, xunit_data)
         self.finish(self._marker.success())
 
     def add_skip(self, runnable_object, reason, runtime):
@@ -579,9 +991,37 @@ class Result(object):
             method_name=runnable.method_name(runnable_object),
         )
 
-        self.skipped.append((runnable_object, xunit_data))
+        self.add_item(SKIP, runnable_object, xunit_data)
         self.finish(self._marker.skip(reason))
 
+    def add_item(self, status, runnable_object, xunit_data):
+        storage = getattr(self, STORAGE_NAMES[status])
+        storage.append(ResultRecord(status, runnable_object, xunit_data))
+
+        for listener in self.__listeners:
+            listener.on_add(self, status, runnable_object, xunit_data)
+
+    def add_record(self, record):
+        """
+        Record is restored without runnable object,
+        therefore record is passed to listeners instead of it.
+        """
+        self.start(record)
+
+        storage = getattr(self, STORAGE_NAMES[record.status])
+        storage.append(record)
+
+        for listener in self.__listeners:
+            listener.on_add(self, record.status, record, record.xunit_data)
+
+        # names of statuses are names of markers
+        marker = getattr(self._marker, record.status)
+
+        if record.status == SKIP:
+            self.finish(marker(record.xunit_data.reason))
+        else:
+            self.finish(marker())
+
     def create_report(self, file_path):
         if self.__is_proxy:
             raise RuntimeError(
@@ -599,6 +1039,9 @@ class Result(object):
                 '* {}: '.format(str(runnable_object)),
             )
 
+        for listener in self.__listeners:
+            listener.on_start(self, runnable_object)
+
     def finish(self, status):
         if self.__config.VERBOSE:
             self.__console.writeln(status)
@@ -618,6 +1061,9 @@ class Result(object):
         self.__console.line_break()
         self.console.flush()
 
+        for listener in self.__listeners:
+            listener.on_begin(self)
+
     def final(self):
         if self.__is_proxy:
             raise RuntimeError(
@@ -637,11 +1083,14 @@ class Result(object):
             self.__console.line_break()
 
             for storage in (self.errors, self.failures):
-                for storage_item in storage:
-                    runnable_object, xunit_data = storage_item
+                for record in storage:
+                    xunit_data = record.xunit_data
                     if xunit_data.reason:
+                        # record is representing of released object
                         crash_reason = reason.create(
-                            runnable_object, xunit_data.reason, config=self.__config,
+                            record.runnable_object or record,
+                            xunit_data.reason,
+                            config=self.__config,
                         )
                         self.__console.writeln(
                             reason.format_reason_to_output(crash_reason),
@@ -679,5 +1128,10 @@ class Result(object):
         self.__console.writeln(total)
         self.__console.flush()
 
+        self.close_writer()
+
         if self.__capture:
             self.__capture.flush(self._stream)
+
+        for listener in self.__listeners:
+            listener.on_final(self)
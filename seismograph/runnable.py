@@ -6,7 +6,6 @@ from collections import OrderedDict
 from contextlib import contextmanager
 
 from .utils import pyv
-from .utils.mp import MPSupportedValue
 
 
 def run(runnable, *args, **kwargs):
@@ -17,6 +16,18 @@ def reason(runnable):
     return runnable.__reason__()
 
 
+def snapshot_reason(runnable):
+    for cls in type(runnable).__mro__:
+        if '__snapshot_reason__' in vars(cls):
+            break
+
+        # __reason__ which was overridden without snapshot is called at failure time
+        if '__reason__' in vars(cls):
+            return RunnableObject.__snapshot_reason__(runnable)
+
+    return runnable.__snapshot_reason__()
+
+
 def stopped_on(runnable, method_name=None):
     if method_name:
         runnable._stopped_on = method_name
@@ -61,6 +72,10 @@ def class_name(runnable):
     return runnable.__class_name__()
 
 
+def stable_id(runnable):
+    return runnable.__stable_id__()
+
+
 def run_method(f):
     @wraps(f)
     def wrapper(self, *args, **kwargs):
@@ -97,9 +112,7 @@ class RunnableObject(object):
 
     def __init__(self):
         self.__id = id(self)
-        self.__stopped_on = MPSupportedValue(
-            method_name(self),
-        )
+        self._stopped_on = method_name(self)
         self.__reason_storage = OrderedDict()
 
     def __call__(self, *args, **kwargs):
@@ -117,14 +130,6 @@ class RunnableObject(object):
     def id(self):
         return self.__id
 
-    @property
-    def _stopped_on(self):
-        return self.__stopped_on.value
-
-    @_stopped_on.setter
-    def _stopped_on(self, value):
-        self.__stopped_on.value = value
-
     @property
     def reason_storage(self):
         return self.__reason_storage
@@ -147,11 +152,25 @@ class RunnableObject(object):
             self.__class__.__module__, self.__class__.__name__,
         )
 
+    def __stable_id__(self):
+        return '{}.{}'.format(
+            class_name(self), method_name(self),
+        )
+
     def __reason__(self):
         return 'Your reason can be here. This is from "{}.{}.__reason__" method.\n'.format(
             self.__class__.__module__, self.__class__.__name__,
         )
 
+    def __snapshot_reason__(self):
+        """
+        State which is needed for reason is taken at failure time,
+        text of reason is rendered by snapshot later.
+        """
+        from .reason import Snapshot
+
+        return Snapshot(pyv.unicode_string, self.__reason__())
+
     def __run__(self, *args, **kwargs):
         raise NotImplementedError(
             'Method "run" not implemented in "{}"'.format(
@@ -159,11 +178,6 @@ class RunnableObject(object):
             ),
         )
 
-    def support_mp(self, manager):
-        self.__stopped_on.set(
-            manager.Value('s', self._stopped_on),
-        )
-
 
 class BuildObjectMixin(object):
 
@@ -17,6 +17,12 @@ CURRENT_STEP_ATTRIBUTE_NAME = '__current_step__'
 CURRENT_FLOW_ATTRIBUTE_NAME = '__current_flow__'
 STEP_BY_STEP_ATTRIBUTE_NAME = '__step_by_step__'
 STEPS_STORAGE_ATTRIBUTE_NAME = '__step_methods__'
+TEST_NAMES_ATTRIBUTE_NAME = '__test_names__'
+
+# Version of attributes of class is changed by setattr and delattr.
+# Test names of class are depending on attributes of its bases,
+# therefore cache is checked by versions of all classes of mro.
+VERSION_ATTRIBUTE_NAME = '__attributes_version__'
 
 
 def step(num, doc=None, performer=None, for_flows=None):
@@ -261,3 +267,41 @@ class CaseMeta(type):
             setattr(cls, loader.DEFAULT_TEST_NAME, _make_run_test())
 
         return cls
+
+    def __setattr__(cls, name, value):
+        type.__setattr__(cls, name, value)
+        cls.__change_version()
+
+    def __delattr__(cls, name):
+        type.__delattr__(cls, name)
+        cls.__change_version()
+
+    def __change_version(cls):
+        type.__setattr__(
+            cls, VERSION_ATTRIBUTE_NAME, cls.__dict__.get(VERSION_ATTRIBUTE_NAME, 0) + 1,
+        )
+
+    def get_versions(cls):
+        return cls.__mro__, tuple(
+            c.__dict__.get(VERSION_ATTRIBUTE_NAME, 0) for c in cls.__mro__
+        )
+
+    def get_test_names(cls, test_name_prefix, default_test_name):
+        """
+        Sorted names of test methods are cached
+        on class until attributes will be changed
+        """
+        key = (test_name_prefix, default_test_name, cls.get_versions())
+        cached = cls.__dict__.get(TEST_NAMES_ATTRIBUTE_NAME)
+
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        test_names = tuple(
+            name for name in sorted(dir(cls))
+            if name.startswith(test_name_prefix) or name == default_test_name
+        )
+
+        type.__setattr__(cls, TEST_NAMES_ATTRIBUTE_NAME, (key, test_names))
+
+        return test_names
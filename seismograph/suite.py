@@ -269,14 +269,19 @@ class Suite(runnable.RunnableObject, runnable.MountObjectMixin, runnable.BuildOb
     def __class_name__(self):
         return self.__name
 
+    def __stable_id__(self):
+        return self.__name
+
+    def __snapshot_reason__(self):
+        return reason.Snapshot(
+            reason.storage_item,
+            'Suite',
+            'info from suite',
+            list(self.reason_storage.items()),
+        )
+
     def __reason__(self):
-        if self.reason_storage:
-            return reason.item(
-                'Suite',
-                'info from suite',
-                *(u'{}: {}'.format(k, v) for k, v in self.reason_storage.items())
-            )
-        return ''
+        return self.__snapshot_reason__()()
 
     @runnable.build_method
     def __run__(self, result):
@@ -328,9 +333,11 @@ class Suite(runnable.RunnableObject, runnable.MountObjectMixin, runnable.BuildOb
 
         self.__is_run = False
         self.__is_build = False
+        self.__build_time = None
 
         self.__case_classes = []
         self.__case_instances = []
+        self.__case_classes_by_name = {}
 
         self.__mount_data__ = None
 
@@ -407,6 +414,14 @@ class Suite(runnable.RunnableObject, runnable.MountObjectMixin, runnable.BuildOb
     def cases(self):
         return self.__case_classes
 
+    @property
+    def cases_by_name(self):
+        return self.__case_classes_by_name
+
+    @property
+    def build_time(self):
+        return self.__build_time
+
     @property
     def context(self):
         return self.__context
@@ -432,6 +447,17 @@ class Suite(runnable.RunnableObject, runnable.MountObjectMixin, runnable.BuildOb
                 self.__case_instances, self.config,
             )
 
+        if self.config.MULTIPROCESSING_CASES:
+            logger.debug(
+                'Use "MultiprocessingCaseGroup" to making case group',
+            )
+
+            from .groups.multiprocessing import MultiprocessingCaseGroup
+
+            return MultiprocessingCaseGroup(
+                self.__case_instances, self.config,
+            )
+
         if self.config.THREADING or self.config.MULTIPROCESSING:
             logger.debug(
                 'Use "ThreadingCaseGroup" to making case group',
@@ -513,10 +539,7 @@ class Suite(runnable.RunnableObject, runnable.MountObjectMixin, runnable.BuildOb
                 'cls': case_class,
                 'tests': dict(
                     (atr, getattr(case_class, atr))
-                    for atr in dir(case_class)
-                    if atr.startswith(loader.TEST_NAME_PREFIX)
-                    or
-                    atr == loader.DEFAULT_TEST_NAME,
+                    for atr in loader.load_test_names_from_case(case_class)
                 ),
             }
 
@@ -575,6 +598,9 @@ class Suite(runnable.RunnableObject, runnable.MountObjectMixin, runnable.BuildOb
                     require=require,
                 ),
             )
+            self.__case_classes_by_name.setdefault(
+                _class.__name__, self.__case_classes[-1],
+            )
 
             return _class
 
@@ -595,6 +621,8 @@ class Suite(runnable.RunnableObject, runnable.MountObjectMixin, runnable.BuildOb
                 ),
             )
 
+        timer = measure_time()
+
         logger.debug(
             'Install extensions on context of suite "{}"'.format(self.name),
         )
@@ -617,3 +645,4 @@ class Suite(runnable.RunnableObject, runnable.MountObjectMixin, runnable.BuildOb
             shuffle(self.__case_instances)
 
         self.__is_build = True
+        self.__build_time = timer()
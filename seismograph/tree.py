@@ -36,19 +36,69 @@ def _doc(string, is_end):
     return '| - {}{}'.format(string, '...' if is_end else '')
 
 
-def print_tree(suites, show_docs=True, doc_lines=1, exit=True):
+def _print_doc(doc, doc_lines, spaces):
+    line_counter = 0
+
+    for line in doc.splitlines():
+        line = line.strip()
+
+        if line:
+            is_end = line_counter == doc_lines - 1
+
+            _print_line(_doc(line, is_end), spaces=spaces)
+
+            line_counter += 1
+
+            if is_end:
+                break
+
+
+def _get_map(suite):
+    mp = suite.get_map()
+
+    return dict(
+        (
+            cls_name,
+            (
+                mp[cls_name]['cls'].__doc__,
+                dict(
+                    (test_name, method.__doc__)
+                    for test_name, method in mp[cls_name]['tests'].items()
+                ),
+            ),
+        )
+        for cls_name in mp
+    )
+
+
+def _get_described_map(description):
+    return dict(
+        (
+            case_description['name'],
+            (
+                case_description['doc'],
+                dict(
+                    (test_name, case_description['docs'].get(test_name))
+                    for test_name in case_description['tests']
+                ),
+            ),
+        )
+        for case_description in description['cases']
+    )
+
+
+def _print_maps(maps, show_docs, doc_lines, exit):
     case_counter = 0
     suite_counter = 0
     method_counter = 0
     suite_names = set()
 
-    suites = list(suites)
-    suites.sort(key=lambda s: s.name)
+    maps = list(maps)
+    maps.sort(key=lambda m: m[0])
 
     # Suites
-    for suite in suites:
+    for suite_name, mp in maps:
         suite_counter += 1
-        suite_name = suite.name
 
         if suite_name in suite_names:
             warn(
@@ -61,11 +111,10 @@ def print_tree(suites, show_docs=True, doc_lines=1, exit=True):
 
         _print_line('* {}'.format(suite_name))
 
-        mp = suite.get_map()
-
         # Cases
         for cls_name in mp:
             case_counter += 1
+            cls_doc, tests = mp[cls_name]
 
             _print_line(
                 _li(
@@ -77,31 +126,15 @@ def print_tree(suites, show_docs=True, doc_lines=1, exit=True):
                 spaces=2,
             )
 
-            if show_docs:
-                cls_doc = mp[cls_name]['cls'].__doc__
+            if show_docs and cls_doc:
+                _print_doc(cls_doc, doc_lines, 4)
 
-                if cls_doc:
-                    line_counter = 0
-
-                    for line in cls_doc.splitlines():
-                        line = line.strip()
-
-                        if line:
-                            is_end = line_counter == doc_lines - 1
-
-                            _print_line(_doc(line, is_end), spaces=4)
-
-                            line_counter += 1
-
-                            if is_end:
-                                break
-
-            if len(mp[cls_name]['tests']) == 1:
+            if len(tests) == 1:
                 method_counter += 1
                 continue
 
             # Tests
-            for test_method in mp[cls_name]['tests']:
+            for test_method in tests:
                 method_counter += 1
 
                 _print_line(
@@ -115,26 +148,27 @@ def print_tree(suites, show_docs=True, doc_lines=1, exit=True):
                     spaces=4,
                 )
 
-                if show_docs:
-                    method_doc = mp[cls_name]['tests'][test_method].__doc__
-
-                    if method_doc:
-                        line_counter = 0
+                if show_docs and tests[test_method]:
+                    _print_doc(tests[test_method], doc_lines, 6)
 
-                        for line in method_doc.splitlines():
-                            line = line.strip()
-
-                            if line:
-                                is_end = line_counter == doc_lines - 1
+    _print_total_info(suite_counter, case_counter, method_counter)
 
-                                _print_line(_doc(line, is_end), spaces=6)
+    if exit:
+        sys.exit(0)
 
-                                line_counter += 1
 
-                                if is_end:
-                                    break
+def print_tree(suites, show_docs=True, doc_lines=1, exit=True):
+    _print_maps(
+        ((suite.name, _get_map(suite)) for suite in suites),
+        show_docs, doc_lines, exit,
+    )
 
-    _print_total_info(suite_counter, case_counter, method_counter)
 
-    if exit:
-        sys.exit(0)
+def print_described_tree(descriptions, show_docs=True, doc_lines=1, exit=True):
+    """
+    Tree by descriptions of suites from collection manifest
+    """
+    _print_maps(
+        ((name, _get_described_map(d)) for name, d in descriptions.items()),
+        show_docs, doc_lines, exit,
+    )
@@ -2,6 +2,8 @@
 
 import sys
 import time
+import weakref
+from functools import wraps
 from . import pyv
 
 from ..exceptions import TimeoutException
@@ -47,6 +49,32 @@ def call_to_chain(chain, method_name, *args, **kwargs):
             obj(*args, **kwargs)
 
 
+def weak_method(method):
+    """
+    Bound method which does not keep its object alive
+    """
+    ref = weakref.ref(method.__self__)
+    func = method.__func__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return func(ref(), *args, **kwargs)
+
+    return wrapper
+
+
+class EmptyContext(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        return False
+
+
+EMPTY_CONTEXT = EmptyContext()
+
+
 def measure_time():
     start_time = time.time()
     return lambda: time.time() - start_time
@@ -49,6 +49,20 @@ elif IS_PYTHON_3:
     reduce = reduce
 
 
+if IS_PYTHON_2:
+    intern = intern
+elif IS_PYTHON_3:
+    intern = sys.intern
+
+
+if IS_PYTHON_2:
+    from Queue import Queue
+    from Queue import Empty
+elif IS_PYTHON_3:
+    from queue import Queue
+    from queue import Empty
+
+
 if IS_PYTHON_2:
     execfile = execfile
 elif IS_PYTHON_3:
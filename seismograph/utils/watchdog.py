@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+"""
+Watchdog for interrupting of hung code
+"""
+
+import sys
+import signal
+import ctypes
+import threading
+import traceback
+
+from . import pyv
+
+
+# count of instructions between checks of pending exception on python 2
+CHECK_INTERVAL = 1000
+
+
+def is_main_thread():
+    return isinstance(threading.current_thread(), threading._MainThread)
+
+
+def format_stack(frame):
+    return ''.join(traceback.format_stack(frame))
+
+
+def format_stacks():
+    names = dict((t.ident, t.name) for t in threading.enumerate())
+
+    return u'\n'.join(
+        u'Thread "{}" ({}):\n{}'.format(
+            names.get(thread_id, 'unknown'), thread_id, format_stack(frame),
+        )
+        for thread_id, frame in sys._current_frames().items()
+    )
+
+
+def interrupt_thread(thread_id, exc_class):
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_long(thread_id), ctypes.py_object(exc_class),
+    )
+
+
+def wait_interrupt():
+    # Pending exception of thread is raised by interpreter
+    # on jump of loop, nothing is happening without it.
+    for _ in pyv.xrange(CHECK_INTERVAL):
+        pass
+
+
+class Watchdog(object):
+    """
+    Raises exception in code of context after timeout.
+    Callback is getting stacks of threads before it.
+
+    Main thread is interrupted by signal, it breaks sleep and io.
+    Other thread is interrupted on next instruction of interpreter.
+    Greenlet is interrupted by timer of gevent hub.
+    """
+
+    def __init__(self, seconds, exc_class, callback=None, use_gevent=False):
+        self.seconds = seconds
+        self.exc_class = exc_class
+        self.callback = callback
+        self.use_gevent = use_gevent
+
+        # handler of signal can be called while lock
+        # is acquired by the same thread in __exit__
+        self.lock = threading.RLock()
+        self.finished = False
+        self.interrupted = False
+
+        self.__stop = None
+
+    def __enter__(self):
+        if not self.seconds:
+            return self
+
+        if self.use_gevent:
+            self.__stop = self.start_greenlet_timer()
+        elif hasattr(signal, 'setitimer') and is_main_thread():
+            self.__stop = self.start_signal_timer()
+        else:
+            self.__stop = self.start_thread_timer()
+
+        return self
+
+    def __exit__(self, exc_type, *args, **kwargs):
+        with self.lock:
+            self.finished = True
+
+        if self.__stop:
+            self.__stop()
+
+        # Thread was interrupted at the end of code of context,
+        # exception is raised here instead of code which is next.
+        if self.interrupted and exc_type is not self.exc_class:
+            wait_interrupt()
+
+    def fire(self, stacks, interrupt=None):
+        # Code of context can not be finished while
+        # callback is called and thread is interrupted.
+        with self.lock:
+            if self.finished:
+                return False
+
+            self.finished = True
+
+            if self.callback:
+                self.callback(stacks)
+
+            if interrupt:
+                interrupt()
+                self.interrupted = True
+
+        return True
+
+    def start_signal_timer(self):
+        def handler(signum, frame):
+            if self.fire(format_stacks()):
+                raise self.exc_class()
+
+        previous = signal.signal(signal.SIGALRM, handler)
+        signal.setitimer(signal.ITIMER_REAL, self.seconds)
+
+        def stop():
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+        return stop
+
+    def start_thread_timer(self):
+        thread_id = threading.current_thread().ident
+
+        def handler():
+            self.fire(
+                format_stacks(),
+                interrupt=lambda: interrupt_thread(thread_id, self.exc_class),
+            )
+
+        timer = threading.Timer(self.seconds, handler)
+        timer.daemon = True
+        timer.start()
+
+        return timer.cancel
+
+    def start_greenlet_timer(self):
+        from gevent import get_hub
+        from gevent import getcurrent
+
+        greenlet = getcurrent()
+
+        def handler():
+            if self.fire(format_stack(greenlet.gr_frame)):
+                greenlet.throw(self.exc_class)
+
+        timer = get_hub().loop.timer(self.seconds)
+        timer.start(handler)
+
+        return timer.stop
@@ -12,9 +12,33 @@ XML_ENCODING = 'UTF-8'
 
 ROUND_RUNTIME = 3
 
+SKIPPED_TAG = 'skipped'
+FAILURE_TAG = 'failure'
+ERROR_TAG = 'error'
+
+# bytes which are reserved for totals in opening tag
+TOTALS_SPACE = 256
+TOTALS_FORMAT = u' tests="{tests}" time="{time}" skip="{skip}" errors="{errors}" failures="{failures}"'
+
+
+def intern_name(name):
+    # names of classes and methods are repeated in many results
+    if isinstance(name, str):
+        return pyv.intern(name)
+    return name
+
 
 class XUnitData(object):
 
+    __slots__ = (
+        '__reason',
+        '__runtime',
+        '__exc_type',
+        '__class_name',
+        '__method_name',
+        '__exc_message',
+    )
+
     def __init__(self,
                  exc=None,
                  reason=None,
@@ -31,8 +55,8 @@ class XUnitData(object):
 
         self.__reason = reason
         self.__runtime = runtime
-        self.__class_name = class_name
-        self.__method_name = method_name
+        self.__class_name = intern_name(class_name)
+        self.__method_name = intern_name(method_name)
 
     @classmethod
     def from_dict(cls, dct):
@@ -50,14 +74,36 @@ class XUnitData(object):
     def from_marshal(cls, string):
         return cls(**marshal.loads(string))
 
+    @classmethod
+    def from_tuple(cls, tpl):
+        return cls(
+            reason=tpl[0],
+            runtime=tpl[1],
+            exc_type=tpl[2],
+            class_name=tpl[3],
+            exc_message=tpl[4],
+            method_name=tpl[5],
+        )
+
     @property
     def reason(self):
+        # snapshot of reason is rendered on first access
+        if callable(self.__reason):
+            self.__reason = self.__reason()
+
         return self.__reason
 
     @reason.setter
     def reason(self, value):
         self.__reason = value
 
+    @property
+    def is_rendered(self):
+        """
+        False while reason is snapshot
+        """
+        return not callable(self.__reason)
+
     @property
     def runtime(self):
         return round(self.__runtime, ROUND_RUNTIME)
@@ -84,7 +130,7 @@ class XUnitData(object):
 
     def to_dict(self):
         return {
-            'reason': self.__reason,
+            'reason': self.reason,
             'runtime': self.__runtime,
             'exc_type': self.__exc_type,
             'class_name': self.__class_name,
@@ -107,6 +153,16 @@ class XUnitData(object):
     def to_marshal(self):
         return marshal.dumps(self.to_dict())
 
+    def to_tuple(self, render=True):
+        return (
+            self.reason if render or self.is_rendered else None,
+            self.__runtime,
+            self.__exc_type,
+            self.__class_name,
+            self.__exc_message,
+            self.__method_name,
+        )
+
 
 def dict_to_tag_attributes(dct):
     string = u' ' + u' '.join(
@@ -143,58 +199,44 @@ def to_xml_tag(tag_name, contains, **attributes):
         tag_name, dict_to_tag_attributes(attributes))
 
 
+def render_test_case(xunit_data, tag_name=None):
+    """
+    Tag name of result is None for success.
+    """
+    if tag_name is None:
+        contains = None
+    elif tag_name == SKIPPED_TAG:
+        contains = to_xml_tag(tag_name,
+                              cdata(xunit_data.reason),
+                              )
+    else:
+        contains = to_xml_tag(tag_name,
+                              cdata(xunit_data.reason),
+                              type=xunit_data.exc_type,
+                              message=xunit_data.exc_message,
+                              )
+
+    return to_xml_tag('testcase',
+                      contains,
+                      time=xunit_data.runtime,
+                      name=xunit_data.method_name,
+                      classname=xunit_data.class_name,
+                      )
+
+
 def create_xml_document(result):
     def render_result_proxy(result_proxy):
         cases_report = []
 
-        for _, xunit_data in result_proxy.successes:
-            cases_report.append(
-                to_xml_tag('testcase', None,
-                           time=xunit_data.runtime,
-                           name=xunit_data.method_name,
-                           classname=xunit_data.class_name,
-                           ),
-            )
-
-        for _, xunit_data in result_proxy.skipped:
-            cases_report.append(
-                to_xml_tag('testcase',
-                           to_xml_tag('skipped',
-                                      cdata(xunit_data.reason),
-                                      ),
-                           time=xunit_data.runtime,
-                           name=xunit_data.method_name,
-                           classname=xunit_data.class_name,
-                           ),
-            )
-
-        for _, xunit_data in result_proxy.failures:
-            cases_report.append(
-                to_xml_tag('testcase',
-                           to_xml_tag('failure',
-                                      cdata(xunit_data.reason),
-                                      type=xunit_data.exc_type,
-                                      message=xunit_data.exc_message,
-                                      ),
-                           time=xunit_data.runtime,
-                           name=xunit_data.method_name,
-                           classname=xunit_data.class_name,
-                           ),
-            )
-
-        for _, xunit_data in result_proxy.errors:
-            cases_report.append(
-                to_xml_tag('testcase',
-                           to_xml_tag('error',
-                                      cdata(xunit_data.reason),
-                                      type=xunit_data.exc_type,
-                                      message=xunit_data.exc_message,
-                                      ),
-                           time=xunit_data.runtime,
-                           name=xunit_data.method_name,
-                           classname=xunit_data.class_name,
-                           ),
-            )
+        for tag_name, storage in (
+                (None, result_proxy.successes),
+                (SKIPPED_TAG, result_proxy.skipped),
+                (FAILURE_TAG, result_proxy.failures),
+                (ERROR_TAG, result_proxy.errors)):
+            for _, xunit_data in storage:
+                cases_report.append(
+                    render_test_case(xunit_data, tag_name=tag_name),
+                )
 
         state = result_proxy.get_state()
 
@@ -233,3 +275,125 @@ def create_xml_document(result):
         return data.encode('utf-8')
 
     return data
+
+
+class XUnitStream(object):
+    """
+    Test cases are appended to file while tests are running.
+    File is valid document after each test case, closing tags
+    are overwritten by next test case and totals are written
+    to reserved space of opening tags.
+    """
+
+    def __init__(self, file_path, name):
+        self.__fp = open(file_path, 'wb')
+
+        self.__suite_name = None
+        self.__suite_totals = None
+        self.__suite_position = None
+
+        self.__totals = self.create_totals()
+
+        self.write(
+            u'<?xml version="{}" encoding="{}"?><testsuites{}'.format(
+                XML_VERSION, XML_ENCODING, dict_to_tag_attributes({'name': name}),
+            ),
+        )
+        self.__position = self.reserve_totals()
+        self.__tail_position = self.__fp.tell()
+
+        self.write_tail()
+
+    @staticmethod
+    def create_totals():
+        return {
+            'tests': 0,
+            'time': 0.0,
+            'skip': 0,
+            'errors': 0,
+            'failures': 0,
+        }
+
+    def write(self, string):
+        self.__fp.write(string.encode('utf-8'))
+
+    def reserve_totals(self):
+        position = self.__fp.tell()
+        self.__fp.write(b' ' * TOTALS_SPACE + b'>')
+        return position
+
+    def write_totals(self, position, totals):
+        string = TOTALS_FORMAT.format(
+            tests=totals['tests'],
+            time=round(totals['time'], ROUND_RUNTIME),
+            skip=totals['skip'],
+            errors=totals['errors'],
+            failures=totals['failures'],
+        ).encode('utf-8')
+
+        if len(string) > TOTALS_SPACE:
+            raise ValueError('totals are longer than reserved space')
+
+        self.__fp.seek(position)
+        self.__fp.write(string.ljust(TOTALS_SPACE))
+
+    def write_tail(self):
+        self.__fp.seek(self.__tail_position)
+
+        if self.__suite_name is not None:
+            self.write(u'</testsuite>')
+
+        self.write(u'</testsuites>')
+
+    def open_suite(self, name):
+        self.__fp.seek(self.__tail_position)
+        self.write(
+            u'<testsuite{}'.format(dict_to_tag_attributes({'name': name})),
+        )
+
+        self.__suite_name = name
+        self.__suite_totals = self.create_totals()
+        self.__suite_position = self.reserve_totals()
+
+    def add(self, suite_name, xunit_data, tag_name=None):
+        # suites of parallel run are interleaved, each
+        # switch of suite opens new element of suite
+        if suite_name != self.__suite_name:
+            if self.__suite_name is not None:
+                self.__fp.seek(self.__tail_position)
+                self.write(u'</testsuite>')
+                self.__tail_position = self.__fp.tell()
+
+            self.open_suite(suite_name)
+        else:
+            self.__fp.seek(self.__tail_position)
+
+        self.write(render_test_case(xunit_data, tag_name=tag_name))
+        self.__tail_position = self.__fp.tell()
+
+        for totals in (self.__suite_totals, self.__totals):
+            totals['tests'] += 1
+            totals['time'] += xunit_data.runtime
+
+            if tag_name == SKIPPED_TAG:
+                totals['skip'] += 1
+            elif tag_name == FAILURE_TAG:
+                totals['failures'] += 1
+            elif tag_name == ERROR_TAG:
+                totals['errors'] += 1
+
+        self.write_tail()
+        self.write_totals(self.__suite_position, self.__suite_totals)
+        self.write_totals(self.__position, self.__totals)
+        self.__fp.flush()
+
+    def close(self, totals=None):
+        """
+        Totals of run are replacing counted totals
+        because they contain runtime of program.
+        """
+        if totals:
+            self.__totals.update(totals)
+
+        self.write_totals(self.__position, self.__totals)
+        self.__fp.close()
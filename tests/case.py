@@ -1,17 +1,35 @@
 # -*- coding: utf-8 -*-
 
+import gc
+import os
+import time
 import inspect
+import tempfile
+import threading
 from collections import OrderedDict
+from xml.etree import ElementTree
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
 
 import seismograph
 from seismograph import case
 from seismograph import xunit
+from seismograph import reason
 from seismograph import result
+from seismograph import loader
+from seismograph import journal
+from seismograph import progress
+from seismograph import runnable
 from seismograph.utils import pyv
 from seismograph.steps import step
+from seismograph.utils import watchdog
 from seismograph import exceptions
 
 from .lib.factories import case_factory
+from .lib.factories import suite_factory
 from .lib.factories import config_factory
 
 from .lib.case import (
@@ -423,6 +441,70 @@ class TestMakeCaseClassFromFunction(BaseTestCase):
         self.assertEqual(class_from_func.__name__, 'la_la_la')
 
 
+class TestTestNames(BaseTestCase):
+
+    def test_cached_names(self):
+        class CaseClass(case.Case):
+
+            def test_two(self):
+                pass
+
+            def test_one(self):
+                pass
+
+            def helper(self):
+                pass
+
+        test_names = loader.load_test_names_from_case(CaseClass)
+
+        self.assertEqual(list(test_names), ['test_one', 'test_two'])
+        self.assertIs(
+            type(CaseClass).get_test_names(CaseClass, 'test', 'test'),
+            type(CaseClass).get_test_names(CaseClass, 'test', 'test'),
+        )
+
+    def test_changed_class(self):
+        class BaseCaseClass(case.Case):
+            pass
+
+        class CaseClass(BaseCaseClass):
+
+            def test_one(self):
+                pass
+
+        self.assertEqual(list(loader.load_test_names_from_case(CaseClass)), ['test_one'])
+
+        BaseCaseClass.test_base = lambda s: None
+
+        self.assertEqual(
+            list(loader.load_test_names_from_case(CaseClass)), ['test_base', 'test_one'],
+        )
+        self.assertEqual(
+            list(loader.load_test_names_from_case(CaseClass, test_name_prefix='test_b')),
+            ['test_base'],
+        )
+
+    def test_other_class_is_changed(self):
+        class CaseClass(case.Case):
+
+            def test_one(self):
+                pass
+
+        class OtherCaseClass(case.Case):
+            pass
+
+        test_names = type(CaseClass).get_test_names(CaseClass, 'test', 'test')
+
+        # cache is kept, class is not based on changed one
+        OtherCaseClass.test_other = lambda s: None
+
+        self.assertIs(type(CaseClass).get_test_names(CaseClass, 'test', 'test'), test_names)
+
+        del CaseClass.test_one
+
+        self.assertEqual(type(CaseClass).get_test_names(CaseClass, 'test', 'test'), ())
+
+
 class TestFlows(BaseTestCase):
 
     def test_flows_decorator_for_method(self):
@@ -529,6 +611,91 @@ class TestErrorCase(RunCaseTestCaseMixin, BaseTestCase):
         )
 
 
+class TestTimeoutCase(RunCaseTestCaseMixin, BaseTestCase):
+
+    class CaseClass(case_factory.FakeCase):
+
+        @case.timeout(0.1)
+        def test(self):
+            time.sleep(5)
+
+    def runTest(self):
+        self.assertEqual(len(self.result.errors), 1)
+
+        _, reason = self.result.errors[0]
+        self.assertEqual(reason.exc_type, 'seismograph.exceptions.CaseTimeout')
+        self.assertLess(reason.runtime, 5)
+
+        self.assertEqual(self.case.reason_storage['Timeout'], 0.1)
+        self.assertIn('time.sleep(5)', self.case.reason_storage['Stacks on timeout'])
+
+
+class TestWatchdogInThread(BaseTestCase):
+
+    def run_in_thread(self, target):
+        errors = []
+
+        def run():
+            try:
+                target()
+                # interpreter is getting time to raise pending exception
+                for _ in range(1000):
+                    time.sleep(0)
+            except BaseException as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+
+        return errors
+
+    def test_timeout(self):
+        def target():
+            with watchdog.Watchdog(0.05, exceptions.CaseTimeout):
+                while True:
+                    pass
+
+        errors = self.run_in_thread(target)
+
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], exceptions.CaseTimeout)
+
+    def test_finished_while_firing(self):
+        fired = threading.Event()
+
+        def callback(stacks):
+            fired.set()
+            time.sleep(0.1)
+
+        def target():
+            try:
+                with watchdog.Watchdog(0.05, exceptions.CaseTimeout, callback=callback):
+                    fired.wait()
+            except exceptions.CaseTimeout:
+                pass
+
+        # timeout is raised inside of context only
+        self.assertEqual(self.run_in_thread(target), [])
+
+
+class TestTimeoutByConfig(RunCaseTestCaseMixin, BaseTestCase):
+
+    __config_options__ = {
+        'TEST_TIMEOUT': 0.1,
+    }
+
+    class CaseClass(case_factory.FakeCase):
+
+        def test(self):
+            while True:
+                pass
+
+    def runTest(self):
+        self.assertEqual(len(self.result.errors), 1)
+        self.assertEqual(case.get_timeout(self.case), 0.1)
+
+
 class TestSkipCase(RunCaseTestCaseMixin, BaseTestCase):
 
     class CaseClass(case_factory.FakeCase):
@@ -645,6 +812,22 @@ class TestCaseCallbacks(RunCaseTestCaseMixin, BaseTestCase):
         )
 
 
+class TestCaseBoxAfterRun(RunCaseTestCaseMixin, BaseTestCase):
+
+    def make_case(self):
+        self.cases = [self.CaseClass('test', config=self.config) for _ in pyv.xrange(2)]
+        self.case = case.CaseBox(self.cases)
+
+    def runTest(self):
+        self.assertEqual(len(self.result.successes), 2)
+
+        # cases are kept, last case is released
+        self.assertEqual(len(self.case), 2)
+        self.assertEqual(list(self.case), self.cases)
+        self.assertIsNone(self.case._CaseBox__current)
+        self.assertIs(self.case.config, self.config)
+
+
 class TestMountData(BaseTestCase):
 
     def runTest(self):
@@ -765,3 +948,313 @@ class TestShouldStop(CaseTestCaseMixin, BaseTestCase):
         self.assertFalse(self.result.errors)
         self.assertFalse(self.result.failures)
         self.assertFalse(self.result.successes)
+
+
+class TestResultListener(CaseTestCaseMixin, BaseTestCase):
+
+    class Listener(result.ResultListener):
+
+        def __init__(self):
+            self.items = []
+
+        def on_add(self, result, status, runnable_object, xunit_data):
+            self.items.append((status, runnable_object))
+
+    def runTest(self):
+        listener = self.Listener()
+        self.result.add_listener(listener)
+
+        self.case(self.result)
+
+        self.assertEqual(listener.items, [(result.SUCCESS, self.case)])
+        self.assertEqual(len(self.result.successes), 1)
+
+
+class TestResultStorage(CaseTestCaseMixin, BaseTestCase):
+
+    def runTest(self):
+        other = self.CaseClass('test', config=self.config)
+
+        self.result.add_success(self.case, 0.1)
+        self.result.add_success(other, 0.2)
+
+        self.assertEqual(len(self.result.successes), 2)
+        self.assertEqual(self.result.get_success_by(other).runtime, 0.2)
+
+        xunit_data = xunit.XUnitData(runtime=0.3)
+
+        self.assertTrue(self.result.reset_success(self.case, xunit_data))
+        self.assertEqual(
+            [i for i, _ in self.result.successes], [other, self.case],
+        )
+        self.assertIs(self.result.get_success_by(self.case), xunit_data)
+        self.assertIs(result.get_last_item_from_storage(self.result.successes)[1], xunit_data)
+        self.assertAlmostEqual(self.result.successes.runtime, 0.5)
+        self.assertEqual(self.result.current_state.runtime, 0.5)
+
+        self.assertIsNone(self.result.get_fail_by(self.case))
+        self.assertFalse(self.result.reset_fail(self.case, xunit_data))
+
+        self.result.add_skip(other, 'reason', 0.5)
+
+        # totals of result are changed by its storages
+        self.assertEqual(self.result.totals.tests, 3)
+        self.assertAlmostEqual(self.result.totals.runtime, 1.0)
+
+        state = self.result.get_state()
+
+        self.assertEqual((state.tests, state.skipped, state.runtime), (3, 1, 1.0))
+        self.assertIs(self.result.get_state(), state)
+
+        # proxy of one case is not locked
+        with self.result.proxy() as result_proxy:
+            self.assertIsNone(result_proxy.successes._ResultStorage__lock)
+            result_proxy.add_success(other, 0.1)
+
+        self.assertEqual(len(self.result.successes), 3)
+        self.assertIsNotNone(self.result.successes._ResultStorage__lock)
+
+
+class TestXUnitStream(CaseTestCaseMixin, BaseTestCase):
+
+    def make_config(self):
+        fd, self.report_path = tempfile.mkstemp(suffix='.xml')
+        os.close(fd)
+
+        self.config = config_factory.create(
+            XUNIT_REPORT=self.report_path, XUNIT_STREAM=True,
+        )
+
+    def tearDown(self):
+        super(TestXUnitStream, self).tearDown()
+        os.remove(self.report_path)
+
+    def runTest(self):
+        self.result.begin()
+        self.result.add_success(self.case, 0.1)
+
+        # report is valid before end of run
+        root = ElementTree.parse(self.report_path).getroot()
+
+        self.assertEqual(root.tag, 'testsuites')
+        self.assertEqual(root.get('tests'), '1')
+        self.assertEqual(len(root.findall('testsuite/testcase')), 1)
+
+        self.result.add_skip(self.case, 'reason', 0.2)
+        self.result.final()
+
+        root = ElementTree.parse(self.report_path).getroot()
+        suite = root.find('testsuite')
+
+        self.assertEqual(root.get('tests'), '2')
+        self.assertEqual(root.get('skip'), '1')
+        self.assertEqual(suite.get('name'), self.result.name)
+        self.assertEqual(suite.get('time'), '0.3')
+        self.assertEqual(suite.find('testcase/skipped').text, 'reason')
+
+
+class TestOutputWriter(BaseTestCase):
+
+    def runTest(self):
+        stream = StringIO()
+        writer = result.OutputWriter()
+        console = result.Console(stream, writer=writer)
+
+        child = console.child_console()
+        child('child')
+        console.write(u'parent\n')
+        console.flush()
+
+        writer.close()
+
+        self.assertEqual(stream.getvalue(), u'parent\n  child\n')
+
+        # stream is written by caller after close
+        console.write(u'last\n')
+        console.flush()
+
+        self.assertTrue(stream.getvalue().endswith(u'last\n'))
+
+
+class TestResultRecord(CaseTestCaseMixin, BaseTestCase):
+
+    def runTest(self):
+        case_inst = self.CaseClass('test', config=self.config)
+        stable_id = runnable.stable_id(case_inst)
+
+        self.result.add_success(case_inst, 0.1)
+
+        runnable_object, xunit_data = self.result.successes[0]
+        self.assertIs(runnable_object, case_inst)
+
+        del runnable_object, case_inst
+        gc.collect()
+
+        record = self.result.successes[0]
+
+        self.assertIsNone(record.runnable_object)
+        self.assertTrue(record.is_case)
+        self.assertEqual(record.stable_id, stable_id)
+        self.assertEqual(record.xunit_data.runtime, 0.1)
+
+
+class TestReasonSnapshot(CaseTestCaseMixin, BaseTestCase):
+
+    def runTest(self):
+        case_inst = self.CaseClass('test', config=self.config)
+        case_inst.reason_storage['hello'] = 'world'
+
+        self.result.add_fail(case_inst, 'Traceback', 0.1, AssertionError())
+
+        # state after failure is not included to reason
+        case_inst.reason_storage['hello'] = 'changed'
+
+        _, xunit_data = self.result.failures[0]
+        self.assertEqual(
+            xunit_data.reason,
+            u'Case (info from test case): \n  hello: world\n\nTraceback',
+        )
+
+        calls = []
+        snapshot = reason.Snapshot(lambda: calls.append(1) or 'text')
+
+        self.assertEqual(snapshot(), 'text')
+        self.assertEqual(snapshot(), 'text')
+        self.assertEqual(len(calls), 1)
+
+        class CaseWithReason(self.CaseClass):
+
+            def __reason__(self):
+                return u'custom\n'
+
+        case_inst = CaseWithReason('test', config=self.config)
+        self.assertEqual(
+            reason.capture(case_inst, 'Traceback')(), u'custom\nTraceback',
+        )
+
+
+class TestResultJournal(CaseTestCaseMixin, BaseTestCase):
+
+    class OtherCaseClass(case_factory.FakeCase):
+        pass
+
+    def setUp(self):
+        super(TestResultJournal, self).setUp()
+
+        self.paths = []
+
+        for _ in range(3):
+            fd, path = tempfile.mkstemp(suffix='.journal')
+            os.close(fd)
+            self.paths.append(path)
+
+    def tearDown(self):
+        super(TestResultJournal, self).tearDown()
+
+        for path in self.paths:
+            os.remove(path)
+
+    def run_to_journal(self, path, fail):
+        result_inst = result.Result(self.config, stream=StringIO())
+        result_inst.add_listener(journal.JournalListener(path))
+
+        other = self.OtherCaseClass('test', config=self.config)
+
+        with result_inst:
+            proxy = result_inst.create_proxy(name='suite')
+            proxy.add_success(self.case, 0.1)
+
+            if fail:
+                proxy.add_fail(other, 'Traceback', 0.2, AssertionError('fail'))
+            else:
+                proxy.add_success(other, 0.2)
+
+            proxy.runtime = 0.3
+            result_inst.extend(proxy)
+            result_inst.proxies.append(proxy)
+
+    def runTest(self):
+        first, second, merged = self.paths
+
+        self.run_to_journal(first, fail=True)
+
+        # last record of crashed run
+        with open(first, 'ab') as fp:
+            fp.write(b'\x00\x00\x01')
+
+        replayed = journal.replay([first], self.config, stream=StringIO())
+        state = replayed.current_state
+
+        self.assertEqual((state.tests, state.failures), (2, 1))
+        self.assertEqual(replayed.proxies[0].name, 'suite')
+        self.assertEqual(replayed.proxies[0].runtime, 0.3)
+        self.assertEqual(replayed.failures[0].xunit_data.reason, u'Traceback')
+        self.assertEqual(
+            replayed.failures[0].stable_id,
+            runnable.stable_id(self.OtherCaseClass('test', config=self.config)),
+        )
+
+        # failed test was passed by second run
+        self.run_to_journal(second, fail=False)
+        journal.merge([first, second], merged)
+
+        replayed = journal.replay([merged], self.config, stream=StringIO())
+        state = replayed.current_state
+
+        self.assertEqual((state.tests, state.failures), (2, 0))
+        self.assertEqual(replayed.proxies[0].runtime, 0.3)
+
+
+class TestJournalReason(CaseTestCaseMixin, BaseTestCase):
+
+    def runTest(self):
+        fd, path = tempfile.mkstemp(suffix='.journal')
+        os.close(fd)
+
+        try:
+            listener = journal.JournalListener(path)
+
+            self.result.add_listener(listener)
+            self.result.begin()
+            self.result.add_fail(self.case, 'Traceback', 0.1, AssertionError('fail'))
+
+            # reason is not rendered by test
+            self.assertFalse(self.result.failures[0].xunit_data.is_rendered)
+
+            # run was crashed before final
+            listener.writer.close()
+
+            replayed = journal.replay([path], self.config, stream=StringIO())
+
+            self.assertEqual(replayed.failures[0].xunit_data.reason, journal.NOT_WRITTEN_REASON)
+        finally:
+            os.remove(path)
+
+
+class TestProgressListener(CaseTestCaseMixin, BaseTestCase):
+
+    def runTest(self):
+        other = self.CaseClass('test', config=self.config)
+        stream = StringIO()
+
+        listener = progress.ProgressListener(
+            [self.case, other], stream=stream, interval=60,
+        )
+        self.result.add_listener(listener)
+
+        self.result.begin()
+        self.result.add_fail(self.case, 'Traceback', 0.1, AssertionError())
+
+        # suite is not counted as test
+        suite = suite_factory.create(config=self.config)
+        self.result.add_error(suite, 'Traceback', 0.1, Exception())
+
+        line = listener.render()
+
+        self.assertTrue(line.startswith(u'1/2 passed=0 failed=1 errors=0 skipped=0 '))
+        self.assertFalse(line.endswith(u'ETA -'))
+
+        self.result.final()
+
+        self.assertIsNone(listener.ticker)
+        self.assertEqual(stream.getvalue().count(u'\n'), 1)
@@ -7,10 +7,13 @@ class FakeConfig(object):
 
     def __init__(self):
         self.XUNIT_REPORT = None
+        self.XUNIT_STREAM = False
+        self.RESULT_JOURNAL = None
         self.VERBOSE = False
         self.OUTPUT = None
         self.NO_CAPTURE = False
         self.SUITE_DETAIL = False
+        self.PROGRESS = False
         self.TREE = False
         self.NO_COLOR = False
         self.STEPS_LOG = False
@@ -23,6 +26,18 @@ class FakeConfig(object):
         self.REPEAT = 0
         self.RANDOM = False
         self.RANDOM_SEED = time.time()
+        self.HISTORY_FILE = None
+        self.SHARD = None
+        self.TEST_TIMEOUT = None
+        self.CACHE_DIR = None
+        self.LAST_FAILED = False
+        self.FAILED_FIRST = False
+        self.RECORD_IMPACT = False
+        self.AFFECTED_BY = None
+        self.PARALLEL_DISCOVERY = None
+        self.COLLECT_ONLY = False
+        self.WORKER = None
+        self.COORDINATOR = None
         self.NO_SCRIPTS = False
         self.ASYNC_SUITES = 0
         self.ASYNC_TESTS = 0
@@ -30,6 +45,7 @@ class FakeConfig(object):
         self.GEVENT = False
         self.THREADING = False
         self.MULTIPROCESSING = False
+        self.MULTIPROCESSING_CASES = False
         self.PDB = False
         self.FIRST_FLOW_ONLY = False
         self.SPLIT_FLOWS = False
@@ -1,6 +1,14 @@
 # -*- coding: utf-8 -*-
 
+import os
+import sys
+import json
+import shutil
+import socket
 import inspect
+import tempfile
+import threading
+from xml.etree import ElementTree
 
 try:
     from StringIO import StringIO
@@ -10,17 +18,30 @@ except ImportError:
 import seismograph
 from seismograph import case
 from seismograph import suite
+from seismograph import cache
 from seismograph import config
 from seismograph import result
+from seismograph import channel
+from seismograph import history
+from seismograph import loader
+from seismograph import impact
+from seismograph import manifest
+from seismograph import collector
 from seismograph import script
 from seismograph import program
 from seismograph.utils import pyv
 from seismograph import extensions
+from seismograph import exceptions
+from seismograph.xunit import XUnitData
+from seismograph.groups import distributed
+from seismograph.groups import multiprocessing
 
 from .lib.case import (
     BaseTestCase,
 )
 from .lib.factories import (
+    case_factory,
+    suite_factory,
     config_factory,
     program_factory,
 )
@@ -337,6 +358,986 @@ class TestShared(BaseTestCase):
             ex_tmp.pop('test_data', None)
 
 
+class TestRuntimeHistory(BaseTestCase):
+
+    def setUp(self):
+        self.history = history.History()
+
+    def test_empty(self):
+        self.assertFalse(self.history)
+
+    def test_sort_cases(self):
+        case_one = case_factory.create()
+        case_two = case_factory.create()
+
+        case_two.__stable_id__ = lambda: 'two'
+
+        self.history.cases[case_one.__stable_id__()] = 0.1
+        self.history.cases['two'] = 0.5
+
+        cases = [case_one, case_two]
+        self.history.sort(cases)
+
+        self.assertIs(cases[0], case_two)
+        self.assertIs(cases[1], case_one)
+
+    def test_unknown_case_has_mean_runtime(self):
+        self.history.cases['one'] = 0.2
+        self.history.cases['two'] = 0.4
+
+        self.assertAlmostEqual(
+            self.history.weight(case_factory.create()), 0.3,
+        )
+
+    def test_suite_weight(self):
+        suite = suite_factory.create()
+        self.history.suites[suite.__stable_id__()] = 10.0
+
+        self.assertEqual(self.history.weight(suite), 10.0)
+
+
+class TestShard(BaseTestCase):
+
+    def setUp(self):
+        self.suites = []
+
+        for suite_name in ('one', 'two', 'three'):
+            suite_inst = suite.Suite(suite_name)
+
+            for case_name in ('A', 'B', 'C'):
+                suite_inst.register(type(case_name, (case.Case,), {'test': lambda s: None}))
+
+            self.suites.append(suite_inst)
+
+    def test_parse_shard(self):
+        self.assertEqual(config.parse_shard('2/8'), (2, 8))
+
+        for value in ('0/8', '9/8', '1', 'a/b'):
+            with self.assertRaises(exceptions.ConfigError):
+                config.parse_shard(value)
+
+    def test_units(self):
+        units = collector.get_shard_units(self.suites)
+
+        self.assertEqual(len(units), 9)
+        self.assertIn('one:A', units)
+
+        units = collector.get_shard_units(
+            self.suites,
+            rules=[suite.BuildRule('two'), suite.BuildRule('one', 'A', 'test')],
+        )
+
+        self.assertEqual(units, ['one:A.test', 'two:A', 'two:B', 'two:C'])
+
+    def test_split(self):
+        units = collector.get_shard_units(self.suites)
+        shards = collector.split_to_shards(units, 4)
+
+        self.assertEqual(sorted(sum(shards, [])), units)
+        self.assertEqual(shards, collector.split_to_shards(units, 4))
+
+    def test_split_by_history(self):
+        runtime_history = history.History()
+        runtime_history.cases['one:A.test'] = 10.0
+        runtime_history.cases['one:B.test'] = 6.0
+        runtime_history.cases['two:A.test'] = 4.0
+
+        shards = collector.split_to_shards(
+            ['one:A', 'one:B', 'two:A'], 2, runtime_history=runtime_history,
+        )
+
+        self.assertEqual(shards, [['one:A'], ['one:B', 'two:A']])
+
+
+class TestLastFailed(BaseTestCase):
+
+    def setUp(self):
+        self.config = config_factory.create(CACHE_DIR=tempfile.mkdtemp())
+
+        self.suite = suite.Suite('one')
+
+        for case_name in ('A', 'B'):
+            self.suite.register(type(case_name, (case.Case,), {'test': lambda s: None}))
+
+    def tearDown(self):
+        shutil.rmtree(self.config.CACHE_DIR)
+
+    def set_failed(self, failed):
+        cache.Cache(self.config.CACHE_DIR).set(cache.LAST_FAILED_KEY, failed)
+
+    def test_empty_cache(self):
+        self.assertEqual(cache.get_last_failed(self.config), set())
+        self.assertIsNone(
+            collector.get_last_failed_rules([self.suite], self.config),
+        )
+
+    def test_is_failed(self):
+        failed = {'one:B.test'}
+
+        self.assertTrue(cache.is_failed(self.suite, failed))
+        self.assertFalse(cache.is_failed(suite.Suite('two'), failed))
+
+    def test_rules(self):
+        self.set_failed(['one:B.test', 'one:C.test', 'two:A.test'])
+
+        rules = collector.get_last_failed_rules([self.suite], self.config)
+
+        self.assertEqual([str(r) for r in rules], ['one:B.test'])
+
+    def test_default_cache_dir(self):
+        options, _ = config.create_option_parser().parse_args([])
+        self.assertIsNone(options.CACHE_DIR)
+
+        for name in ('LAST_FAILED', 'FAILED_FIRST', 'RECORD_IMPACT', 'AFFECTED_BY'):
+            config_inst = config_factory.create(**{name: True})
+            config.prepare_config(config_inst)
+
+            self.assertEqual(config_inst.CACHE_DIR, config.DEFAULT_CACHE_DIR)
+
+        # cache is not used by run without options of cache
+        config_inst = config_factory.create()
+        config.prepare_config(config_inst)
+
+        self.assertIsNone(config_inst.CACHE_DIR)
+
+    def test_rules_out_of_tests(self):
+        self.set_failed(['one:B.test'])
+        rules = [suite.BuildRule('one', 'A')]
+
+        self.assertIs(
+            collector.get_last_failed_rules([self.suite], self.config, rules=rules),
+            rules,
+        )
+
+
+class TestImpact(BaseTestCase):
+
+    def setUp(self):
+        self.index = impact.ImpactIndex(
+            files={'a.py': '1', 'b.py': '2'},
+            tests={'one:A.test': ['a.py'], 'one:B.test': ['a.py', 'b.py']},
+        )
+
+    def test_affected(self):
+        affected = self.index.get_affected(
+            ['one:A.test', 'one:B.test', 'one:C.test'], {'b.py'},
+        )
+
+        self.assertEqual(affected, ['one:B.test', 'one:C.test'])
+
+    def test_is_fresh(self):
+        digests = {'a.py': '1', 'b.py': '3'}
+
+        self.assertTrue(self.index.is_fresh('one:A.test', digests.get))
+        self.assertFalse(self.index.is_fresh('one:B.test', digests.get))
+        self.assertFalse(self.index.is_fresh('one:C.test', digests.get))
+
+    def test_update(self):
+        digests = {'a.py': '3', 'b.py': '2', 'c.py': '4'}
+
+        self.index.update({'one:A.test': {'a.py', 'c.py'}}, digests.get)
+
+        # recording of B was made with old version of a.py
+        self.assertEqual(self.index.tests, {'one:A.test': ['a.py', 'c.py']})
+        self.assertEqual(self.index.files, {'a.py': '3', 'c.py': '4'})
+
+    def test_tracer(self):
+        recorded = []
+
+        with impact.Tracer(callback=recorded.append):
+            case_factory.create()
+
+        self.assertIn(case.__file__.replace('.pyc', '.py'), recorded[0])
+
+    def test_gevent(self):
+        config_inst = config_factory.create(RECORD_IMPACT=True, GEVENT=True)
+
+        with self.assertRaises(exceptions.ConfigError):
+            config.prepare_config(config_inst)
+
+
+class TestCollectionManifest(BaseTestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.storage = cache.Cache(os.path.join(self.path, 'cache'))
+        self.file_path = os.path.join(self.path, 'module.py')
+
+        with open(self.file_path, 'w') as fp:
+            fp.write('# suites')
+
+        self.suite = suite.Suite('one')
+        self.suite.register(type('A', (case.Case,), {'test': lambda s: None}))
+
+        collection_manifest = manifest.CollectionManifest(self.storage)
+        collection_manifest.add_module(
+            self.file_path, type('module', (object,), {'__name__': 'module'}), [self.suite],
+        )
+        collection_manifest.update([self.suite])
+        collection_manifest.save()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_describe(self):
+        collection_manifest = manifest.CollectionManifest(self.storage)
+
+        self.assertEqual(collection_manifest.modules[self.file_path]['suites'], ['one'])
+        self.assertEqual(collection_manifest.suites['one']['cases'][0]['name'], 'A')
+        self.assertEqual(collection_manifest.suites['one']['cases'][0]['tests'], ['test'])
+
+    def test_use_descriptions(self):
+        collection_manifest = manifest.CollectionManifest(self.storage, use_descriptions=True)
+
+        self.assertFalse(collection_manifest.need_import(self.file_path, 'module'))
+        self.assertEqual(collection_manifest.described, [self.file_path])
+        self.assertEqual(list(collection_manifest.get_descriptions([])), ['one'])
+
+        # manifest without storage is not used
+        self.assertTrue(
+            manifest.CollectionManifest(None, use_descriptions=True).need_import(
+                self.file_path, 'module',
+            ),
+        )
+
+    def test_described_report(self):
+        report = manifest.create_described_report(
+            {'one': manifest.describe_suite(self.suite)}, commands=['one:A'],
+        )
+
+        self.assertEqual([t['id'] for t in report['tests']], ['one:A.test'])
+        self.assertEqual(report['suites'][0]['name'], 'one')
+
+    def test_need_import(self):
+        for selected, need_import in ((None, True), (['one'], True), (['two'], False)):
+            collection_manifest = manifest.CollectionManifest(self.storage, selected=selected)
+
+            self.assertEqual(
+                collection_manifest.need_import(self.file_path, 'module'), need_import,
+            )
+
+    def test_changed_module(self):
+        with open(self.file_path, 'w') as fp:
+            fp.write('# suites were changed')
+
+        self.assertTrue(
+            manifest.CollectionManifest(self.storage, selected=['two']).need_import(
+                self.file_path, 'module',
+            ),
+        )
+
+    def test_static_scan(self):
+        with open(self.file_path, 'w') as fp:
+            fp.write(
+                'suite = Suite(__name__)\n'
+                'other = seismograph.Suite(name="other")\n'
+                '@suite.register\n'
+                'def test(case):\n'
+                '    pass\n',
+            )
+
+        self.assertEqual(
+            loader.scan_suite_names(self.file_path, 'module'), {'module', 'other'},
+        )
+        self.assertFalse(
+            manifest.CollectionManifest(self.storage, selected=['two']).need_import(
+                self.file_path, 'module',
+            ),
+        )
+
+        with open(self.file_path, 'a') as fp:
+            fp.write('imported_suite.register(Case)\n')
+
+        self.assertIsNone(loader.scan_suite_names(self.file_path, 'module'))
+
+    def test_discover(self):
+        file_path = os.path.join(self.path, 'discovered_module.py')
+
+        with open(file_path, 'w') as fp:
+            fp.write(
+                'import seismograph\n'
+                'NAME = "discovered"\n'
+                'suite = seismograph.Suite(NAME)\n'
+                '@suite.register\n'
+                'def test(case):\n'
+                '    pass\n',
+            )
+
+        sys.path.insert(0, self.path)
+
+        try:
+            entries, descriptions = manifest.discover_modules(
+                [(file_path, 'discovered_module', None)], suite.Suite,
+            )
+        finally:
+            sys.path.remove(self.path)
+
+        self.assertEqual(entries[file_path]['suites'], ['discovered'])
+        self.assertEqual(list(descriptions), ['discovered'])
+
+
+class TestDescribedCollection(BaseTestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.config = config_factory.create(
+            CACHE_DIR=os.path.join(self.path, 'cache'), COLLECT_ONLY=True,
+        )
+
+        with open(os.path.join(self.path, 'described_module.py'), 'w') as fp:
+            fp.write(
+                'import seismograph\n'
+                'suite = seismograph.Suite("described")\n'
+                '@suite.register\n'
+                'class CaseClass(seismograph.Case):\n'
+                '    def test(self):\n'
+                '        pass\n'
+                '    @seismograph.skip("reason")\n'
+                '    def test_skip(self):\n'
+                '        pass\n',
+            )
+
+    def tearDown(self):
+        self.is_imported()
+        sys.path.remove(self.path)
+        shutil.rmtree(self.path)
+
+    def is_imported(self):
+        # name of module is changed by loader
+        names = [n for n in sys.modules if n.startswith('described_module_')]
+
+        for name in names:
+            del sys.modules[name]
+
+        return bool(names)
+
+    def collect(self):
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+
+        try:
+            program_inst = program.Program(suites_path=self.path, exit=False, stream=StringIO())
+            program_factory.set_config(program_inst, self.config)
+            program_inst()
+
+            return json.loads(sys.stdout.getvalue())
+        finally:
+            sys.stdout = stdout
+
+    def test_collect_only(self):
+        report = self.collect()
+
+        self.assertTrue(self.is_imported())
+
+        # module is not changed, so it is not imported again
+        described_report = self.collect()
+
+        self.assertFalse(self.is_imported())
+        self.assertEqual(described_report['tests'], report['tests'])
+        self.assertEqual(
+            [t['skip'] for t in described_report['tests']], [None, 'reason'],
+        )
+
+
+class TestCollectReport(BaseTestCase):
+
+    def test_report(self):
+        suite_inst = suite_factory.create(config=config_factory.create())
+
+        @suite_inst.register
+        class CaseClass(case.Case):
+
+            def test(self):
+                pass
+
+            @case.skip('reason')
+            def test_skip(self):
+                pass
+
+        suite_inst.build()
+
+        report = manifest.create_report([suite_inst], import_times={'module': 0.5})
+
+        self.assertEqual(
+            [(t['id'], t['skip']) for t in report['tests']],
+            [
+                ('{}:CaseClass.test'.format(suite_inst.name), None),
+                ('{}:CaseClass.test_skip'.format(suite_inst.name), 'reason'),
+            ],
+        )
+        self.assertIsNotNone(report['suites'][0]['build_time'])
+        self.assertEqual(report['modules'], [{'module': 'module', 'import_time': 0.5}])
+
+
+class TestGeneratorByCommands(BaseTestCase):
+
+    def test_group_rules(self):
+        rules = [
+            suite.BuildRule('one', 'A'),
+            suite.BuildRule('two', 'A'),
+            suite.BuildRule('one', 'B', 'test'),
+        ]
+
+        grouped = collector.group_rules_by_suite(rules)
+
+        self.assertEqual(list(grouped), ['one', 'two'])
+        self.assertEqual([str(r) for r in grouped['one']], ['one:B.test', 'one:A'])
+
+    def test_suite_not_found(self):
+        with self.assertRaises(exceptions.LoaderError):
+            list(collector.generator_by_commands([], [suite.BuildRule('one')]))
+
+
+class TestSocketChannel(BaseTestCase):
+
+    def setUp(self):
+        left, right = socket.socketpair()
+
+        self.sender = distributed.SocketChannel(left)
+        self.receiver = distributed.SocketChannel(right)
+
+    def tearDown(self):
+        self.sender.close()
+        self.receiver.close()
+
+    def test_records(self):
+        records = [
+            (0, 'fail', 'suite:Case.test', ('x' * 100000, 0.1, None, None, None, 'test')),
+            (4,),
+        ]
+
+        for record in records:
+            self.sender.send(record)
+
+        # records are json, so tuples are received as lists
+        self.assertEqual(
+            self.receiver.receive(),
+            [0, 'fail', 'suite:Case.test', ['x' * 100000, 0.1, None, None, None, 'test']],
+        )
+        self.assertEqual(self.receiver.receive(), [4])
+
+    def test_too_big(self):
+        self.sender.sock.sendall(distributed.HEADER.pack(distributed.MAX_RECORD_SIZE + 1))
+
+        with self.assertRaises(ValueError):
+            self.receiver.receive()
+
+    def test_closed(self):
+        self.sender.close()
+
+        with self.assertRaises(EOFError):
+            self.receiver.receive()
+
+    def test_parse_address(self):
+        self.assertEqual(config.parse_address('localhost:8000'), ('localhost', 8000))
+
+        with self.assertRaises(exceptions.ConfigError):
+            config.parse_address('localhost')
+
+
+class TestDistributedRun(BaseTestCase):
+
+    def setUp(self):
+        self.config = config_factory.create(
+            COORDINATOR=('127.0.0.1', 0), MULTIPROCESSING_TIMEOUT=10.0,
+        )
+        self.result = result.Result(self.config, stream=StringIO())
+        self.threads = []
+
+    def tearDown(self):
+        for thread in self.threads:
+            thread.join()
+
+    def create_suites(self, config, names=('one', 'two', 'three')):
+        suites = []
+
+        for name in names:
+            suite_inst = suite.Suite(name)
+            suite_inst.__mount_data__ = suite.MountData(config)
+
+            @suite_inst.register
+            class CaseClass(case.Case):
+
+                def test(self):
+                    pass
+
+                def test_other(self):
+                    assert self.__mount_data__.suite_name != 'two'
+
+            suite_inst.build()
+            suites.append(suite_inst)
+
+        return suites
+
+    def run_worker(self, address, names=('one', 'two', 'three')):
+        config = config_factory.create(WORKER=address, MULTIPROCESSING_TIMEOUT=10.0)
+        worker_result = result.Result(config, stream=StringIO())
+
+        with worker_result:
+            distributed.WorkerSuiteGroup(self.create_suites(config, names), config)(worker_result)
+
+    def start_worker(self, address, names=('one', 'two', 'three')):
+        thread = threading.Thread(target=self.run_worker, args=(address, names))
+        thread.daemon = True
+        thread.start()
+
+        self.threads.append(thread)
+
+    def serve(self, *workers):
+        with self.result:
+            with distributed.Coordinator(self.result, self.config, self.create_suites(self.config)) as coordinator:
+                address = coordinator.server.getsockname()
+
+                for names in workers:
+                    self.start_worker(address, names)
+
+                coordinator.serve()
+
+    def test_run(self):
+        fd, self.config.XUNIT_REPORT = tempfile.mkstemp(suffix='.xml')
+        os.close(fd)
+
+        try:
+            self.serve(('one', 'two', 'three'), ('one', 'two', 'three'))
+
+            root = ElementTree.parse(self.config.XUNIT_REPORT).getroot()
+        finally:
+            os.remove(self.config.XUNIT_REPORT)
+
+        state = self.result.current_state
+
+        self.assertEqual((state.tests, state.failures, state.successes), (6, 1, 5))
+        self.assertEqual(len(self.result.proxies), 3)
+
+        self.assertEqual(root.get('tests'), '6')
+        self.assertEqual(root.get('failures'), '1')
+        self.assertEqual(
+            sorted(s.get('name') for s in root.findall('testsuite')),
+            ['one', 'three', 'two'],
+        )
+        self.assertEqual(len(root.findall('testsuite/testcase')), 6)
+
+    def test_lost_worker(self):
+        taken = []
+
+        def lost_worker(address):
+            worker_channel = distributed.SocketChannel(socket.create_connection(address))
+
+            # connection is closed after suite was taken
+            taken.append(worker_channel.receive()[1])
+            worker_channel.close()
+
+            self.start_worker(address)
+
+        with self.result:
+            with distributed.Coordinator(self.result, self.config, self.create_suites(self.config)) as coordinator:
+                thread = threading.Thread(target=lost_worker, args=(coordinator.server.getsockname(), ))
+                thread.daemon = True
+                thread.start()
+
+                self.threads.append(thread)
+
+                coordinator.serve()
+
+        state = self.result.current_state
+
+        # suite of lost worker was given to another one
+        self.assertEqual(taken, ['one'])
+        self.assertEqual((state.tests, state.failures, state.successes), (6, 1, 5))
+        self.assertEqual(
+            sorted(p.name for p in self.result.proxies), ['one', 'three', 'two'],
+        )
+
+    def test_lost_partly_run(self):
+        def lost_worker(address, coordinator):
+            worker_channel = distributed.SocketChannel(socket.create_connection(address))
+
+            key = worker_channel.receive()[1]
+            first, second = coordinator.merger.units[key]
+
+            xunit_data = XUnitData(runtime=0.1, class_name='CaseClass', method_name='test')
+
+            # connection is closed while second test is running
+            worker_channel.send((channel.ADD_RECORD, result.SUCCESS, first, xunit_data.to_tuple()))
+            worker_channel.send((channel.START_RECORD, second, 1))
+            worker_channel.close()
+
+            self.start_worker(address)
+
+        with self.result:
+            with distributed.Coordinator(self.result, self.config, self.create_suites(self.config)) as coordinator:
+                thread = threading.Thread(
+                    target=lost_worker, args=(coordinator.server.getsockname(), coordinator),
+                )
+                thread.daemon = True
+                thread.start()
+
+                self.threads.append(thread)
+
+                coordinator.serve()
+
+        state = self.result.current_state
+
+        # rest of suite was not given to another worker
+        self.assertEqual(
+            (state.tests, state.errors, state.failures, state.successes), (6, 1, 1, 4),
+        )
+        self.assertIn('Worker was lost while test was running', self.result.errors[0][1].exc_message)
+
+    def test_not_collected(self):
+        self.serve(('one', 'three'))
+
+        state = self.result.current_state
+
+        self.assertEqual((state.tests, state.errors, state.successes), (5, 1, 4))
+        self.assertIn('Suite "two" was not collected on worker', self.result.errors[0][1].exc_message)
+
+
+class TestMultiprocessingRun(BaseTestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.config = config_factory.create(
+            MULTIPROCESSING=True, MULTIPROCESSING_TIMEOUT=10.0,
+        )
+        self.result = result.Result(self.config, stream=StringIO())
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def create_suite(self, name, *case_classes):
+        suite_inst = suite.Suite(name)
+        suite_inst.__mount_data__ = suite.MountData(self.config)
+
+        for case_class in case_classes:
+            suite_inst.register(case_class)
+
+        suite_inst.build()
+
+        return suite_inst
+
+    def log(self, *items):
+        # workers are writing to file because they are processes
+        with open(os.path.join(self.path, 'log'), 'a') as fp:
+            fp.write(u'{}\n'.format(u' '.join(pyv.unicode_string(i) for i in items)))
+
+    def read_log(self):
+        with open(os.path.join(self.path, 'log')) as fp:
+            return [line.split() for line in fp.read().splitlines()]
+
+    def run_suites(self, suites, pool_size):
+        self.config.ASYNC_SUITES = pool_size
+
+        with self.result:
+            multiprocessing.MultiprocessingSuiteGroup(suites, self.config)(self.result)
+
+    def test_more_suites_than_pool(self):
+        log = self.log
+
+        def test(case):
+            log(case.__mount_data__.suite_name, os.getpid())
+
+        self.run_suites(
+            [self.create_suite('suite_{}'.format(i), test) for i in range(5)], 2,
+        )
+
+        state = self.result.current_state
+
+        self.assertEqual((state.tests, state.successes), (5, 5))
+        self.assertEqual(len(self.result.proxies), 5)
+        self.assertEqual(sorted(n for n, _ in self.read_log()), ['suite_{}'.format(i) for i in range(5)])
+        self.assertLessEqual(len(set(p for _, p in self.read_log())), 2)
+
+    def test_case_box(self):
+        log = self.log
+
+        class CaseMixin(object):
+
+            @classmethod
+            def setup_class(cls):
+                log(cls.__name__, 'setup_class', os.getpid())
+
+            def test_one(self):
+                log(self.__class__.__name__, 'test', os.getpid())
+
+            def test_two(self):
+                log(self.__class__.__name__, 'test', os.getpid())
+
+        self.config.MULTIPROCESSING_CASES = True
+        self.config.ASYNC_TESTS = 2
+
+        with self.result:
+            self.create_suite(
+                'suite',
+                type('CaseClass', (CaseMixin, case.Case), {}),
+                type('OtherCaseClass', (CaseMixin, case.Case), {}),
+            )(self.result)
+
+        self.assertEqual(self.result.current_state.successes, 4)
+
+        for class_name in ('CaseClass', 'OtherCaseClass'):
+            lines = [line for line in self.read_log() if line[0] == class_name]
+
+            # box of case class is run by one worker
+            self.assertEqual([line[1] for line in lines], ['setup_class', 'test', 'test'])
+            self.assertEqual(len(set(line[2] for line in lines)), 1)
+
+    def test_cases_of_suite(self):
+        log = self.log
+
+        def test(case):
+            log(case.__class__.__name__, os.getpid())
+
+        self.config.MULTIPROCESSING_CASES = True
+        self.config.ASYNC_TESTS = 2
+
+        suite_inst = self.create_suite(
+            'suite', *[type('Case{}'.format(i), (case.Case,), {'test': test}) for i in range(4)]
+        )
+
+        with self.result:
+            with self.result.proxy(suite_inst) as result_proxy:
+                multiprocessing.MultiprocessingCaseGroup(list(suite_inst), self.config)(result_proxy)
+
+        pids = set(pid for _, pid in self.read_log())
+
+        # cases are run by workers and results are merged to suite
+        self.assertEqual(result_proxy.get_state().successes, 4)
+        self.assertEqual(self.result.current_state.successes, 4)
+        self.assertEqual(sorted(n for n, _ in self.read_log()), ['Case{}'.format(i) for i in range(4)])
+        self.assertNotIn(str(os.getpid()), pids)
+        self.assertLessEqual(len(pids), 2)
+
+    def test_big_output(self):
+        def test(case):
+            # record is bigger than buffer of pipe
+            assert False, 'x' * 500000
+
+        self.run_suites([self.create_suite('suite', test)], 1)
+
+        self.assertEqual(len(self.result.failures), 1)
+        self.assertIn('x' * 500000, self.result.failures[0][1].reason)
+
+    def test_writer_of_worker(self):
+        def test(case):
+            pass
+
+        # output of workers is written by thread of writer
+        self.config.THREADING = True
+        self.result = result.Result(self.config, stream=StringIO())
+
+        self.run_suites([self.create_suite('suite_{}'.format(i), test) for i in range(4)], 2)
+
+        self.assertIn('\n....\n', self.result._stream.getvalue())
+
+    def test_crashed_worker(self):
+        def test(case):
+            pass
+
+        def test_crash(case):
+            os._exit(3)
+
+        # cases of suite are run by one thread
+        self.config.ASYNC_TESTS = 1
+
+        suites = [self.create_suite('suite_{}'.format(i), test) for i in range(4)]
+        suites.insert(1, self.create_suite('crashed', test_crash, test))
+
+        self.run_suites(suites, 2)
+
+        state = self.result.current_state
+
+        # other suites are run by new worker
+        self.assertEqual((state.tests, state.errors, state.successes), (6, 2, 4))
+        crashed, lost = sorted(x.reason for _, x in self.result.errors)
+
+        self.assertIn('was crashed with exit code "3"', crashed)
+        self.assertIn('was lost before test was run', lost)
+        self.assertFalse(state.was_success)
+
+    def test_crashed_on_start(self):
+        def test(case):
+            pass
+
+        suites = [self.create_suite('suite_{}'.format(i), test) for i in range(3)]
+
+        multiprocessing.import_mp()
+
+        with self.result:
+            with multiprocessing.Multiprocessing(
+                    self.result,
+                    self.config,
+                    crash_on_start,
+                    2,
+                    match=multiprocessing.MPResult.match_suite,
+                    objects=suites) as mp:
+                mp.serve()
+
+        state = self.result.current_state
+
+        # workers are not restarted forever, tasks are errors
+        self.assertEqual(mp.restarts, [multiprocessing.MAX_RESTARTS + 1] * 2)
+        self.assertEqual((state.tests, state.errors), (3, 3))
+        self.assertIn('workers were crashed', self.result.errors[0][1].reason)
+
+
+def crash_on_start(*args):
+    os._exit(3)
+
+
+class TestPipeChannel(BaseTestCase):
+
+    def setUp(self):
+        multiprocessing.import_mp()
+
+        self.channel = multiprocessing.PipeChannel()
+
+    def test_big_record(self):
+        record = (channel.OUTPUT_RECORD, u'x' * 1000000)
+
+        # record is bigger than buffer of pipe, so it is sent by thread
+        thread = threading.Thread(target=self.channel.send, args=(record, ))
+        thread.daemon = True
+        thread.start()
+
+        self.assertEqual(list(self.channel.receive(timeout=10.0)), [record])
+
+        thread.join()
+
+    def test_empty(self):
+        self.assertEqual(list(self.channel.receive()), [])
+
+    def test_order(self):
+        for i in range(3):
+            self.channel.send((channel.STOP_RECORD, i))
+
+        records = []
+
+        for _ in range(3):
+            records.extend(self.channel.receive())
+
+        self.assertEqual(records, [(channel.STOP_RECORD, i) for i in range(3)])
+
+
+class TestChannelListener(BaseTestCase):
+
+    class ListChannel(list):
+
+        def send(self, record):
+            self.append(record)
+
+    def runTest(self):
+        config_inst = config_factory.create()
+        owner_result = result.Result(config_inst, stream=StringIO())
+        worker_result = result.Result(config_inst, stream=StringIO())
+
+        case_inst = case_factory.create(config=config_inst)
+        other = case_factory.create(config=config_inst)
+
+        merger = channel.ResultMerger(owner_result)
+        merger.match_case(case_inst)
+        merger.match_case(other)
+
+        records = self.ListChannel()
+        channel.connect_result(worker_result, records)
+
+        # each result is sent at once and is merged by owner at once
+        worker_result.add_success(case_inst, 0.1)
+
+        self.assertEqual([r[0] for r in records], [channel.ADD_RECORD])
+
+        merger.merge(records[-1])
+
+        self.assertEqual(len(owner_result.successes), 1)
+        self.assertIs(owner_result.successes[0].runnable_object, case_inst)
+
+        worker_result.add_fail(other, 'Traceback', 0.2, AssertionError('fail'))
+        merger.merge(records[-1])
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(owner_result.failures[0].xunit_data.reason, u'Traceback')
+
+
+class TestResultMerger(BaseTestCase):
+
+    def setUp(self):
+        self.config = config_factory.create()
+        self.result = result.Result(self.config, stream=StringIO())
+        self.suite = suite_factory.create(config=self.config)
+
+        @self.suite.register
+        class CaseClass(case.Case):
+
+            def test_one(self):
+                pass
+
+            def test_two(self):
+                pass
+
+            def test_three(self):
+                pass
+
+            def test_four(self):
+                pass
+
+        self.suite.build()
+
+        self.merger = channel.ResultMerger(self.result)
+        self.merger.match_suite(self.suite)
+
+        self.keys = self.merger.units[channel.get_id(self.suite)]
+
+    def test_killed_worker(self):
+        one, two, three, four = self.keys
+
+        with self.result:
+            self.merger.merge((channel.TASK_RECORD, channel.get_id(self.suite), 1))
+
+            # two tests are running by threads of worker
+            self.merger.merge((channel.START_RECORD, one, 1))
+            self.merger.merge((channel.START_RECORD, two, 1))
+            self.merger.merge((channel.START_RECORD, three, 2))
+
+            self.assertEqual(sorted(k for k, _ in self.merger.get_running(1)), sorted([one, two]))
+
+            self.merger.add_killed(1)
+            self.merger.close()
+
+        self.assertEqual(self.result.current_state.tests, 3)
+        self.assertEqual(len(self.result.errors), 3)
+        self.assertEqual(
+            sorted(x.exc_type for _, x in self.result.errors),
+            ['seismograph.exceptions.WorkerError'] * 3,
+        )
+        self.assertEqual(self.merger.get_running(2)[0][0], three)
+        self.assertNotIn(three, self.merger.merged)
+
+    def test_crashed_worker(self):
+        one, two, three, four = self.keys
+
+        with self.result:
+            self.merger.merge((channel.TASK_RECORD, channel.get_id(self.suite), 1))
+            self.merger.merge((channel.START_RECORD, one, 1))
+
+            self.merger.add_crashed(1, -11)
+            self.merger.close()
+
+        self.assertEqual(len(self.result.errors), 4)
+        self.assertIn('exit code "-11"', self.result.errors[0][1].reason)
+        self.assertIn('was lost before test was run', self.result.errors[1][1].reason)
+
+    def test_hung(self):
+        one = self.keys[0]
+
+        self.merger.merge((channel.START_RECORD, one, 1))
+        self.assertIsNone(self.merger.get_hung(1))
+
+        self.merger.objects[one].__timeout__ = 0.01
+        self.merger.started[one] = (1, self.merger.started[one][1] - 1)
+
+        self.assertEqual(self.merger.get_hung(1), one)
+
+
 class TestFullCycle(BaseTestCase):
 
     def runTest(self):